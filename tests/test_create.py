@@ -15,7 +15,7 @@ class TestCreateView:
             response = user_client.get('/create/')
         assert response.status_code != 404, 'Страница `/create/` не найдена, проверьте этот адрес в *urls.py*'
         assert 'form' in response.context, 'Проверьте, что передали форму `form` в контекст страницы `/create/`'
-        assert len(response.context['form'].fields) == 2, 'Проверьте, что в форме `form` на страницу `/create/` 2 поля'
+        assert len(response.context['form'].fields) == 3, 'Проверьте, что в форме `form` на страницу `/create/` 3 поля'
         assert 'group' in response.context['form'].fields, (
             'Проверьте, что в форме `form` на странице `/create/` есть поле `group`'
         )
@@ -36,6 +36,16 @@ class TestCreateView:
             'Проверьте, что в форме `form` на странице `/create/` поле `text` обязательно'
         )
 
+        assert 'image' in response.context['form'].fields, (
+            'Проверьте, что в форме `form` на странице `/create/` есть поле `image`'
+        )
+        assert isinstance(response.context['form'].fields['image'], forms.fields.ImageField), (
+            'Проверьте, что в форме `form` на странице `/create/` поле `image` типа `ImageField`'
+        )
+        assert not response.context['form'].fields['image'].required, (
+            'Проверьте, что в форме `form` на странице `/create/` поле `image` не обязательно'
+        )
+
     @pytest.mark.django_db(transaction=True)
     def test_create_view_post(self, user_client, user, group):
         text = 'Проверка нового поста!'
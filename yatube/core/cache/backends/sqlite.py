@@ -0,0 +1,279 @@
+"""Кеш в файле SQLite, общий для всех процессов одного хоста.
+
+Замена LocMemCache там, где воркеров несколько, а Memcached или Redis
+заводить не хочется: записи, ``incr`` и блокировки через ``add``
+видны всем процессам сразу. Файл работает в режиме WAL, так что
+читатели не ждут писателей.
+
+::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.backends.sqlite.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 100_000, 'MAX_SIZE': 256 * 2 ** 20},
+        },
+    }
+
+При превышении ``MAX_ENTRIES`` записей или ``MAX_SIZE`` байт сначала
+удаляются истёкшие записи, затем давно не читанные (LRU), пока кеш не
+сократится на ``1 / CULL_FREQUENCY``. Время последнего чтения
+обновляется не чаще раза в ``TOUCH_INTERVAL`` секунд, чтобы чтения не
+превращались в записи.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats
+    SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats
+    SET entries = entries - 1, bytes = bytes - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache
+BEGIN
+    UPDATE cache_stats SET bytes = bytes - OLD.size + NEW.size;
+END;
+'''
+UPSERT = '''
+INSERT INTO cache (key, value, expires, accessed, size)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value, expires = excluded.expires,
+    accessed = excluded.accessed, size = excluded.size
+'''
+# Оставляет самые свежие записи, пока укладывается в оба предела.
+EVICT = '''
+DELETE FROM cache WHERE key IN (
+    SELECT key FROM (
+        SELECT key,
+               ROW_NUMBER() OVER recent AS number,
+               SUM(size) OVER recent AS total
+        FROM cache
+        WINDOW recent AS (
+            ORDER BY accessed DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+    )
+    WHERE number > ? OR total > ?
+)
+'''
+# Целые числа хранятся как INTEGER SQLite, остальное — pickle.
+INTEGER_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def encode(value):
+    if type(value) is int and value in INTEGER_RANGE:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def decode(raw):
+    return raw if isinstance(raw, int) else pickle.loads(raw)
+
+
+def size_of(raw):
+    return 8 if isinstance(raw, int) else len(raw)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = os.path.abspath(location)
+        self._max_size = options.get('MAX_SIZE', 64 * 2 ** 20)
+        self._touch_interval = options.get('TOUCH_INTERVAL', 1)
+        self._busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self._local = threading.local()
+
+    def _connection(self):
+        # Соединение своё у каждого потока и у каждого процесса: после
+        # fork унаследованное соединение использовать нельзя.
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            db = sqlite3.connect(
+                self._path, timeout=self._busy_timeout,
+                isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = NORMAL')
+            db.executescript('BEGIN IMMEDIATE;' + SCHEMA + 'COMMIT;')
+            self._local.db, self._local.pid = db, pid
+        return self._local.db
+
+    @contextmanager
+    def _write(self):
+        """Транзакция с блокировкой записи с самого начала: чтение и
+        запись внутри неё атомарны для всех процессов."""
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _alive(self, expires, now):
+        return expires is None or expires > now
+
+    def _cull(self, db):
+        entries, size = db.execute(
+            'SELECT entries, bytes FROM cache_stats').fetchone()
+        too_many = self._max_entries and entries > self._max_entries
+        too_big = self._max_size and size > self._max_size
+        if not (too_many or too_big):
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        keep = 1 - 1 / max(self._cull_frequency, 1)
+        db.execute(EVICT, (
+            int((self._max_entries or entries) * keep),
+            int((self._max_size or size) * keep),
+        ))
+
+    def _set(self, db, key, value, timeout, now):
+        raw = encode(value)
+        db.execute(UPSERT, (
+            key, raw, self.get_backend_timeout(timeout), now, size_of(raw)))
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        db = self._connection()
+        now = time.time()
+        row = db.execute(
+            'SELECT value, expires, accessed FROM cache WHERE key = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return default
+        raw, expires, accessed = row
+        if not self._alive(expires, now):
+            db.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, now))
+            return default
+        if now - accessed > self._touch_interval:
+            db.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        return decode(raw)
+
+    def get_many(self, keys, version=None):
+        made = {self._key(key, version): key for key in keys}
+        if not made:
+            return {}
+        now = time.time()
+        rows = self._connection().execute(
+            'SELECT key, value, expires FROM cache WHERE key IN ({})'.format(
+                ', '.join('?' * len(made))),
+            list(made),
+        )
+        return {
+            made[key]: decode(raw)
+            for key, raw, expires in rows if self._alive(expires, now)
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as db:
+            self._set(db, key, value, timeout, time.time())
+            self._cull(db)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        now = time.time()
+        with self._write() as db:
+            for key, value in data.items():
+                self._set(db, self._key(key, version), value, timeout, now)
+            self._cull(db)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write() as db:
+            row = db.execute(
+                'SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._alive(row[0], now):
+                return False
+            self._set(db, key, value, timeout, now)
+            self._cull(db)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        with self._write() as db:
+            row = db.execute(
+                'SELECT value, expires FROM cache WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None or not self._alive(row[1], now):
+                raise ValueError("Key '%s' not found" % key)
+            value = decode(row[0]) + delta
+            raw = encode(value)
+            db.execute(
+                'UPDATE cache SET value = ?, accessed = ?, size = ? '
+                'WHERE key = ?',
+                (raw, now, size_of(raw), key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        cursor = self._connection().execute(
+            'UPDATE cache SET expires = ?, accessed = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), now, key, now),
+        )
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._connection().execute(
+            'SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+        return row is not None and self._alive(row[0], time.time())
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        cursor = self._connection().execute(
+            'DELETE FROM cache WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._connection().execute(
+                'DELETE FROM cache WHERE key IN ({})'.format(
+                    ', '.join('?' * len(keys))),
+                keys,
+            )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
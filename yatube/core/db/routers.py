@@ -0,0 +1,75 @@
+"""Чтение с реплики для безопасных запросов.
+
+Реплика включается настройкой ``REPLICA_DATABASE`` (алиас из
+``DATABASES``). На неё уходит чтение только внутри
+``ReplicaMiddleware`` для GET/HEAD; команды, shell и небезопасные
+запросы работают с основной базой. Запись всегда идёт в основную базу
+и до конца запроса возвращает туда же и чтение, как и открытая
+транзакция: иначе view не увидит только что записанное.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE', None)
+
+
+def _atomic_depth():
+    connection = connections[DEFAULT_DB_ALIAS]
+    # Каждый вложенный atomic() добавляет элемент в savepoint_ids.
+    return connection.in_atomic_block + len(connection.savepoint_ids)
+
+
+@contextmanager
+def request_scope(replica):
+    """Состояние одного запроса: можно ли читать с реплики и была ли
+    запись. Отдаёт объект с атрибутом ``wrote``."""
+    _state.active = True
+    # Транзакции, открытые до запроса (например, тестом), не в счёт.
+    _state.atomic_depth = _atomic_depth()
+    _state.replica = replica
+    _state.wrote = False
+    try:
+        yield _state
+    finally:
+        _state.active = _state.replica = False
+
+
+def pin_primary():
+    """До конца запроса читать из основной базы."""
+    _state.replica = False
+
+
+class ReplicaRouter:
+    """Вне запроса (команды, миграции) не вмешивается: Django сам
+    выбирает базу по ``using()`` и объектам-подсказкам."""
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'active', False):
+            return None
+        alias = replica_alias()
+        if (alias is None or not _state.replica
+                or _atomic_depth() > _state.atomic_depth):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if not getattr(_state, 'active', False):
+            return None
+        _state.wrote = True
+        pin_primary()
+        # Явно: объект, прочитанный с реплики, иначе записался бы туда.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В реплике те же строки, что и в основной базе.
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
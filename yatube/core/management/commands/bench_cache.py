@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from posts.bench import percentile
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    'sqlite': 'core.cache.backends.sqlite.SQLiteCache',
+}
+COUNTER_KEY = 'bench:counter'
+
+
+def make_cache(name, directory, max_entries):
+    location = {
+        'locmem': f'bench-{name}',
+        'filebased': os.path.join(directory, 'files'),
+        'sqlite': os.path.join(directory, 'cache.sqlite3'),
+    }[name]
+    return import_string(BACKENDS[name])(location, {
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    })
+
+
+def worker(name, directory, options, seed, barrier, results):
+    """Читает ключи по схеме read-through: промах — «посчитать» значение
+    и положить в кеш. Каждая ``incr_every``-я операция — incr общего
+    счётчика."""
+    cache = make_cache(name, directory, options['keys'] * 2)
+    rng = random.Random(seed)
+    value = 'x' * options['value_size']
+    latencies, hits, misses, increments = [], 0, 0, 0
+    barrier.wait()
+    for number in range(1, options['ops'] + 1):
+        key = f'bench:{rng.randrange(options["keys"])}'
+        started = time.perf_counter()
+        if number % options['incr_every'] == 0:
+            cache.incr(COUNTER_KEY)
+            increments += 1
+        elif cache.get(key) is None:
+            misses += 1
+            cache.set(key, value)
+        else:
+            hits += 1
+        latencies.append(time.perf_counter() - started)
+    results.put((latencies, hits, misses, increments))
+
+
+class Command(BaseCommand):
+    help = (
+        'Несколько процессов одновременно работают с кешем (read-through '
+        'и incr общего счётчика) на LocMemCache, FileBasedCache и '
+        'SQLiteCache. Показывает ops/s, задержки, долю попаданий и '
+        'сохранил ли счётчик все инкременты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument(
+            '--ops', type=int, default=5000,
+            help='Операций на процесс.',
+        )
+        parser.add_argument('--keys', type=int, default=1000)
+        parser.add_argument('--value-size', type=int, default=1024)
+        parser.add_argument('--incr-every', type=int, default=10)
+        parser.add_argument(
+            '--backend', action='append', choices=BACKENDS, default=[],
+            help='Замерить только этот backend.',
+        )
+
+    def handle(self, *args, **options):
+        # fork: дочерним процессам не нужно заново настраивать Django.
+        context = multiprocessing.get_context('fork')
+        for name in options['backend'] or BACKENDS:
+            directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+            try:
+                self.report(name, self.run(context, name, directory, options))
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def run(self, context, name, directory, options):
+        cache = make_cache(name, directory, options['keys'] * 2)
+        cache.set(COUNTER_KEY, 0, None)
+        barrier = context.Barrier(options['processes'] + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(
+                name, directory, options, seed, barrier, results))
+            for seed in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        barrier.wait()
+        started = time.perf_counter()
+        collected = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+        latencies = [
+            latency for result in collected for latency in result[0]]
+        hits = sum(result[1] for result in collected)
+        misses = sum(result[2] for result in collected)
+        return {
+            'ops': len(latencies) / elapsed,
+            'p50_us': percentile(latencies, 0.5) * 1e6,
+            'p95_us': percentile(latencies, 0.95) * 1e6,
+            'hit_rate': hits / max(hits + misses, 1),
+            'increments': sum(result[3] for result in collected),
+            # Что видит родитель: у LocMemCache — только свою копию.
+            'counter': cache.get(COUNTER_KEY),
+        }
+
+    def report(self, name, result):
+        lost = result['increments'] - (result['counter'] or 0)
+        self.stdout.write(
+            f'{name:<10} {result["ops"]:10.0f} ops/s  '
+            f'p50 {result["p50_us"]:7.1f} µs  '
+            f'p95 {result["p95_us"]:7.1f} µs  '
+            f'hits {result["hit_rate"]:6.1%}  '
+            f'counter {result["counter"]}/{result["increments"]}'
+            + (f' (потеряно {lost})' if lost else '')
+        )
@@ -0,0 +1,171 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from posts.bench import percentile, post_text
+from posts.models import Post, User
+
+# Режимы сравнения: как работал стандартный sqlite3 и как работает
+# core.db.backends.sqlite3. None отключает pragma из PRAGMAS.
+MODES = {
+    'default': {
+        'pragmas': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'mmap_size': None,
+            'cache_size': None,
+            'busy_timeout': None,
+            'temp_store': None,
+        },
+        'persistent': False,
+    },
+    'tuned': {'pragmas': {}, 'persistent': True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка на копию базы: читатели открывают первую '
+        'страницу ленты, писатели публикуют посты. Сравнивает '
+        'стандартный режим SQLite (rollback journal, соединение на '
+        'запрос) с WAL, PRAGMA и постоянными соединениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Секунд нагрузки на каждый режим.',
+        )
+        parser.add_argument(
+            '--posts', type=int, default=0,
+            help='Сколько постов добавить в копию перед замером.',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        source = connections[options['database']]
+        if source.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан только на SQLite.')
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        try:
+            results = {
+                mode: self.run(mode, source, directory, options)
+                for mode in MODES
+            }
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        self.report(results)
+
+    def run(self, mode, source, directory, options):
+        alias = f'bench_{mode}'
+        path = os.path.join(directory, f'{mode}.sqlite3')
+        # Копия через backup API: работает и для базы в памяти у тестов.
+        source.ensure_connection()
+        target = sqlite3.connect(path)
+        source.connection.backup(target)
+        target.close()
+        connections.databases[alias] = {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': path,
+            'OPTIONS': {'pragmas': MODES[mode]['pragmas']},
+        }
+        try:
+            author_id = self.prepare(alias, options['posts'])
+            return self.load(alias, author_id, MODES[mode]['persistent'],
+                             options)
+        finally:
+            connections[alias].close()
+            del connections.databases[alias]
+
+    def prepare(self, alias, count):
+        author, _ = User.objects.using(alias).get_or_create(
+            username='bench_sqlite')
+        rng = random.Random(0)
+        Post.objects.using(alias).bulk_create(
+            [Post(author=author, text=post_text(rng)) for _ in range(count)])
+        connections[alias].close()
+        return author.pk
+
+    def load(self, alias, author_id, persistent, options):
+        rng = random.Random(1)
+
+        def read():
+            posts = Post.objects.using(alias).select_related(
+                'author', 'group')
+            posts.count()
+            list(posts[:10])
+
+        def write():
+            with transaction.atomic(using=alias):
+                Post.objects.using(alias).bulk_create(
+                    [Post(author_id=author_id, text=post_text(rng))])
+
+        deadline = time.perf_counter() + options['duration']
+        workers = [('read', read)] * options['readers'] + [
+            ('write', write)] * options['writers']
+        samples = {kind: ([], []) for kind in ('read', 'write')}
+        threads = [
+            threading.Thread(target=self.worker, args=(
+                alias, operation, deadline, persistent, *samples[kind]))
+            for kind, operation in workers
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            kind: {
+                'ops': len(latencies) / elapsed,
+                'p95_ms': (
+                    percentile(latencies, 0.95) * 1000
+                    if latencies else None),
+                'errors': len(errors),
+            }
+            for kind, (latencies, errors) in samples.items()
+        }
+
+    def worker(self, alias, operation, deadline, persistent,
+               latencies, errors):
+        # list.append атомарен, общие списки потокам не мешают.
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError as error:
+                    # «database is locked» после busy timeout.
+                    errors.append(error)
+                else:
+                    latencies.append(time.perf_counter() - started)
+                if not persistent:
+                    # CONN_MAX_AGE = 0: соединение на каждый запрос.
+                    connections[alias].close()
+        finally:
+            connections[alias].close()
+
+    def report(self, results):
+        for mode, result in results.items():
+            self.stdout.write(mode)
+            for kind, data in result.items():
+                p95 = data['p95_ms']
+                self.stdout.write(
+                    f'    {kind:<5} {data["ops"]:9.1f} ops/s  '
+                    f'p95 {"-" if p95 is None else f"{p95:.1f}"} ms  '
+                    f'errors {data["errors"]}')
+        for kind in ('read', 'write'):
+            before = results['default'][kind]['ops']
+            after = results['tuned'][kind]['ops']
+            gain = f'×{after / before:.2f}' if before else '—'
+            self.stdout.write(f'{kind}: {gain}')
@@ -0,0 +1,225 @@
+import json
+import time
+from importlib import import_module
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from posts.bench import WORDS, generate_dataset, percentile, rollback
+from posts.models import Post
+
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls')
+ROLES = ('anonymous', 'authorized')
+# Параметры запроса, без которых view ничего не делает.
+QUERY_PARAMS = {
+    'post:search': {'q': WORDS[0]},
+}
+# Не страницы: меняют состояние и принимают только POST.
+SKIP = ('post:profile_follow', 'post:profile_unfollow')
+# Метрики, рост которых считается регрессией.
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'bytes')
+
+
+def url_patterns():
+    """Имена и параметры всех маршрутов из ``URLCONFS``."""
+    for urlconf in URLCONFS:
+        module = import_module(urlconf)
+        for pattern in module.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = f'{module.app_name}:{pattern.name}'
+            if name not in SKIP:
+                yield name, list(pattern.pattern.converters)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все страницы posts, users и about через тестовый '
+        'клиент на синтетических данных и пишет p50/p95, число запросов '
+        'и размер ответа в JSON. С --compare сравнивает прогон с '
+        'сохранённым отчётом. Данные откатываются, кеш очищается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--warmup', type=int, default=2,
+            help='Незамеряемых запросов перед замером.',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--only', action='append', default=[],
+            help='Замерить только эти маршруты (например post:main).',
+        )
+        parser.add_argument('--output', help='Куда записать JSON-отчёт.')
+        parser.add_argument(
+            '--compare', help='JSON-отчёт, с которым сравнить прогон.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый относительный рост метрики (0.2 = 20%%).',
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0,
+            help='Рост времени меньше этого порога считается шумом.',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as error:
+                raise CommandError(error)
+        cache.clear()
+        try:
+            with rollback():
+                self.stderr.write(f'Создаю {options["posts"]} постов...')
+                users, groups = generate_dataset(
+                    users=options['users'],
+                    groups=options['groups'],
+                    posts=options['posts'],
+                    seed=options['seed'],
+                    log=self.stderr.write,
+                )
+                report = self.run(users[0], groups[0])
+        finally:
+            # В кеше остались счётчики и страницы откаченных данных.
+            cache.clear()
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, ensure_ascii=False, indent=2)
+        if baseline is not None:
+            regressions = self.compare(report, baseline)
+            if regressions:
+                raise CommandError(f'Регрессий: {regressions}')
+
+    def url_kwargs(self, author, group):
+        """Значения параметров маршрутов на сгенерированных данных."""
+        post = author.posts.order_by('-pub_date', '-id').first()
+        return {
+            'username': author.username,
+            'slug': group.slug,
+            'post_id': post.pk if post else Post.objects.first().pk,
+        }
+
+    def host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        return hosts[0].lstrip('.') if hosts else 'localhost'
+
+    def run(self, author, group):
+        values = self.url_kwargs(author, group)
+        clients = {
+            'anonymous': Client(HTTP_HOST=self.host()),
+            'authorized': Client(HTTP_HOST=self.host()),
+        }
+        results = []
+        for name, params in url_patterns():
+            if self.options['only'] and name not in self.options['only']:
+                continue
+            path = reverse(name, kwargs={key: values[key] for key in params})
+            for role in ROLES:
+                results.append(self.measure(
+                    clients[role], role, name, path, author))
+        return {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                **{
+                    key: self.options[key]
+                    for key in ('users', 'groups', 'posts', 'seed',
+                                'repeat', 'cold')
+                },
+            },
+            'views': results,
+        }
+
+    def request(self, client, role, path, params, author):
+        if role == 'authorized' and '_auth_user_id' not in client.session:
+            # Например, после users:logout.
+            client.force_login(author)
+        if self.options['cold']:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path, params)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = (time.perf_counter() - started) * 1000
+        return response.status_code, elapsed, len(queries), size
+
+    def measure(self, client, role, name, path, author):
+        params = QUERY_PARAMS.get(name, {})
+        for _ in range(self.options['warmup']):
+            self.request(client, role, path, params, author)
+        samples = [
+            self.request(client, role, path, params, author)
+            for _ in range(self.options['repeat'])
+        ]
+        timings = [sample[1] for sample in samples]
+        return {
+            'name': name,
+            'role': role,
+            'path': path,
+            'status': samples[-1][0],
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': max(sample[2] for sample in samples),
+            'bytes': max(sample[3] for sample in samples),
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{"view":<28} {"role":<11} {"status":>6} {"p50, ms":>9} '
+            f'{"p95, ms":>9} {"queries":>8} {"bytes":>10}')
+        for row in report['views']:
+            self.stdout.write(
+                f'{row["name"]:<28} {row["role"]:<11} {row["status"]:>6} '
+                f'{row["p50_ms"]:>9.2f} {row["p95_ms"]:>9.2f} '
+                f'{row["queries"]:>8} {row["bytes"]:>10}')
+
+    def is_regression(self, metric, value, old):
+        if metric in ('p50_ms', 'p95_ms'):
+            return (value > old * (1 + self.options['threshold'])
+                    and value - old > self.options['min_delta_ms'])
+        if metric == 'queries':
+            return value > old
+        return value > old * (1 + self.options['threshold'])
+
+    def compare(self, report, baseline):
+        """Печатает выросшие метрики и возвращает их число."""
+        old_rows = {
+            (row['name'], row['role']): row for row in baseline['views']}
+        regressions = 0
+        for row in report['views']:
+            old = old_rows.get((row['name'], row['role']))
+            if old is None:
+                continue
+            for metric in METRICS:
+                if self.is_regression(metric, row[metric], old[metric]):
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'РЕГРЕССИЯ {row["name"]} [{row["role"]}] '
+                        f'{metric}: {old[metric]} -> {row[metric]}'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+        return regressions
@@ -0,0 +1,82 @@
+import sys
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slowlog import normalize_sql, read_entries
+
+SORT_KEYS = {
+    'total': lambda shape: shape['total_ms'],
+    'max': lambda shape: shape['max_ms'],
+    'avg': lambda shape: shape['total_ms'] / shape['count'],
+    'count': lambda shape: shape['count'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: top-N форм SQL, в которых '
+        'литералы заменены на «?», с числом, суммарным, средним и '
+        'максимальным временем и самыми частыми view.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы журнала или «-» для stdin; по умолчанию '
+                 'SLOW_LOG_FILE.',
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total')
+        parser.add_argument('--view', help='Только запросы этого view.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [settings.SLOW_LOG_FILE]
+        shapes = defaultdict(lambda: {
+            'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'views': Counter(), 'slowest': None,
+        })
+        for entry in self.entries(paths):
+            if entry['type'] != 'query':
+                continue
+            if options['view'] and entry.get('view') != options['view']:
+                continue
+            shape = shapes[normalize_sql(entry['sql'])]
+            duration = entry['duration_ms']
+            shape['count'] += 1
+            shape['total_ms'] += duration
+            shape['views'][entry.get('view')] += 1
+            if duration >= shape['max_ms']:
+                shape['max_ms'] = duration
+                shape['slowest'] = entry.get('request_id')
+        if not shapes:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        ranked = sorted(
+            shapes.items(), key=lambda item: SORT_KEYS[options['sort']](
+                item[1]), reverse=True)
+        for number, (sql, shape) in enumerate(
+                ranked[:options['top']], start=1):
+            views = ', '.join(
+                f'{view} ×{count}'
+                for view, count in shape['views'].most_common(3))
+            self.stdout.write(
+                f'#{number} count={shape["count"]} '
+                f'total={shape["total_ms"]:.1f}ms '
+                f'avg={shape["total_ms"] / shape["count"]:.1f}ms '
+                f'max={shape["max_ms"]:.1f}ms '
+                f'slowest_request={shape["slowest"]}')
+            self.stdout.write(f'    views: {views}')
+            self.stdout.write(f'    {sql}')
+
+    def entries(self, paths):
+        for path in paths:
+            if path == '-':
+                yield from read_entries(sys.stdin)
+                continue
+            try:
+                with open(path, encoding='utf-8') as stream:
+                    yield from read_entries(stream)
+            except OSError as error:
+                raise CommandError(error)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в реплику через backup API: '
+        'локальная замена репликации для проверки ReplicaRouter.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--replica', default=None,
+            help='Алиас реплики; по умолчанию REPLICA_DATABASE '
+                 'или «replica».',
+        )
+
+    def handle(self, *args, **options):
+        alias = (options['replica']
+                 or getattr(settings, 'REPLICA_DATABASE', None)
+                 or 'replica')
+        if alias not in connections.databases:
+            raise CommandError(f'В DATABASES нет базы «{alias}».')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Копирование рассчитано только на SQLite.')
+        if primary.settings_dict['NAME'] == replica.settings_dict['NAME']:
+            raise CommandError('Реплика и основная база — один файл.')
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+        replica.close()
+        self.stdout.write(
+            f'{primary.settings_dict["NAME"]} → '
+            f'{replica.settings_dict["NAME"]}')
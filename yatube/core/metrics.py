@@ -0,0 +1,214 @@
+"""Метрики запросов по именам маршрутов в текстовом формате Prometheus.
+
+Данные живут в памяти процесса, как в prometheus_client без
+multiprocess-режима: каждый воркер отдаёт свои значения, суммирует их
+сервер мониторинга. Запись метрики — несколько сложений под общей
+блокировкой и не зависит от ``DEBUG``: запросы к базе считает
+``execute_wrapper``, а не ``connection.queries``.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+UNRESOLVED = 'unresolved'
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """Счётчики одного запроса."""
+
+    __slots__ = ('queries', 'db_time', 'template_time', 'rendering')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка для ``connection.execute_wrapper``."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def activate(metrics):
+    _local.metrics = metrics
+
+
+def deactivate():
+    _local.metrics = None
+
+
+def install_template_timer():
+    """Засекает время ``render()`` шаблонов Django-бэкенда.
+
+    Учитывается только внешний вызов: include и вложенный
+    render_to_string уже входят в его время.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'timed', False):
+        return
+    original = Template.render
+
+    @wraps(original)
+    def render(self, *args, **kwargs):
+        metrics = getattr(_local, 'metrics', None)
+        if metrics is None or metrics.rendering:
+            return original(self, *args, **kwargs)
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+            metrics.rendering = False
+
+    render.timed = True
+    Template.render = render
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        # bisect_left кладёт значение, равное границе, в её корзину (le).
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statuses = {}
+
+
+# (имя метрики, описание, атрибут ViewMetrics)
+HISTOGRAMS = (
+    ('yatube_request_duration_seconds',
+     'Время обработки запроса.', 'duration'),
+    ('yatube_request_db_queries',
+     'Число SQL-запросов на HTTP-запрос.', 'queries'),
+    ('yatube_response_size_bytes',
+     'Размер тела ответа (без потоковых ответов).', 'response_size'),
+)
+COUNTERS = (
+    ('yatube_db_query_seconds_total',
+     'Суммарное время SQL-запросов.', 'db_time'),
+    ('yatube_template_render_seconds_total',
+     'Суммарное время отрисовки шаблонов.', 'template_time'),
+)
+# Счётчики событий, которые приложения отмечают через registry.count().
+EVENTS = (
+    ('yatube_fragment_cache_total',
+     'Обращения к кешу фрагментов ленты по результату.'),
+)
+
+
+def _escape(value):
+    return (value.replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.events = {}
+
+    def record(self, view, status, duration, metrics, size=None):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = ViewMetrics()
+            stats.duration.observe(duration)
+            stats.queries.observe(metrics.queries)
+            if size is not None:
+                stats.response_size.observe(size)
+            stats.db_time += metrics.db_time
+            stats.template_time += metrics.template_time
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def count(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.events[key] = self.events.get(key, 0) + 1
+
+    def value(self, name, **labels):
+        with self.lock:
+            return self.events.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+            self.events.clear()
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus 0.0.4."""
+        with self.lock:
+            views = sorted(self.views.items())
+            lines = []
+            for name, help_text, attr in HISTOGRAMS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, stats in views:
+                    labels = f'view="{_escape(view)}"'
+                    lines.extend(getattr(stats, attr).samples(name, labels))
+            for name, help_text, attr in COUNTERS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for view, stats in views:
+                    lines.append(
+                        f'{name}{{view="{_escape(view)}"}} '
+                        f'{getattr(stats, attr)}')
+            name = 'yatube_responses_total'
+            lines.append(f'# HELP {name} Ответы по кодам статуса.')
+            lines.append(f'# TYPE {name} counter')
+            for view, stats in views:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'{name}{{view="{_escape(view)}",'
+                        f'status="{status}"}} {count}')
+            events = sorted(self.events.items())
+            for name, help_text in EVENTS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (event, labels), count in events:
+                    if event != name:
+                        continue
+                    labels = ','.join(
+                        f'{label}="{_escape(str(value))}"'
+                        for label, value in labels)
+                    lines.append(f'{name}{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
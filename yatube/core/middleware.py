@@ -0,0 +1,404 @@
+import cProfile
+import hashlib
+import math
+import mimetypes
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, urlencode
+from django.utils.module_loading import import_string
+
+from . import metrics, profiler, slowlog
+from .db import routers
+from .storage import is_hashed
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную ``collectstatic`` статику из ``STATIC_ROOT``.
+
+    Стоит первым: статике не нужны ни сессии, ни метрики. Если клиент
+    принимает gzip и рядом лежит ``<имя>.gz``, отдаётся сжатая копия.
+    Файлы с хешем в имени кешируются на год с ``immutable``, остальные —
+    на ``STATIC_MAX_AGE`` секунд. Не найденный файл уходит дальше по
+    цепочке. Отключается настройкой ``STATIC_SERVE = False``.
+    """
+
+    GZIP_RE = re.compile(r'\bgzip\b')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not (getattr(settings, 'STATIC_SERVE', True)
+                and settings.STATIC_ROOT):
+            raise MiddlewareNotUsed
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60 * 60)
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            name = request.path_info[len(self.prefix):]
+            path = self.find(name)
+            if path is not None:
+                return self.serve(request, name, path)
+        return self.get_response(request)
+
+    def find(self, name):
+        try:
+            path = safe_join(self.root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        return path if os.path.isfile(path) else None
+
+    def serve(self, request, name, path):
+        last_modified = int(os.stat(path).st_mtime)
+        response = get_conditional_response(
+            request, last_modified=last_modified)
+        gzipped = os.path.isfile(f'{path}.gz')
+        if response is None:
+            content_type, _ = mimetypes.guess_type(name)
+            if gzipped and self.GZIP_RE.search(
+                    request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                response = FileResponse(open(f'{path}.gz', 'rb'))
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = FileResponse(open(path, 'rb'))
+            # FileResponse угадал бы тип по «.gz», а не по самому файлу.
+            response['Content-Type'] = (
+                content_type or 'application/octet-stream')
+        if gzipped:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['Last-Modified'] = http_date(last_modified)
+        if is_hashed(staticfiles_storage, name):
+            patch_cache_control(
+                response, public=True, max_age=IMMUTABLE_MAX_AGE,
+                immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
+class AnonymousCacheMiddleware:
+    """Кеширует целые ответы для анонимных GET-запросов.
+
+    Стоит в ``MIDDLEWARE`` сразу после ``StaticFilesMiddleware``,
+    ``MetricsMiddleware`` и ``SlowLogMiddleware``: статика отдаётся
+    раньше, а метрики и журнал учитывают и ответы из кеша. Всё, что
+    ниже, — реплика, сессии, CSRF, ORM и шаблоны — при попадании в кеш
+    не выполняется.
+
+    Анонимным считается запрос без cookie сессии и сообщений, кешируются
+    только страницы из ``ANONYMOUS_CACHE_URL_NAMES``.
+
+    Чтобы истечение популярного ключа не вызвало сотню одновременных
+    пересборок, запись обновляется заранее с вероятностью, растущей к
+    концу срока (probabilistic early expiration), а пересобирает её
+    только запрос, взявший блокировку; остальные в это время получают
+    прежнюю копию.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.url_names = set(
+            getattr(settings, 'ANONYMOUS_CACHE_URL_NAMES', ()))
+        if not self.url_names:
+            raise MiddlewareNotUsed
+        self.cache = caches[
+            getattr(settings, 'ANONYMOUS_CACHE_ALIAS', 'default')]
+        self.timeout = getattr(settings, 'ANONYMOUS_CACHE_TIMEOUT', 60)
+        # Сколько копия живёт после срока, пока её пересобирают.
+        self.stale_timeout = getattr(
+            settings, 'ANONYMOUS_CACHE_STALE_TIMEOUT', 30)
+        self.lock_timeout = getattr(
+            settings, 'ANONYMOUS_CACHE_LOCK_TIMEOUT', 10)
+        # Сколько ждать чужой пересборки, если копии ещё нет.
+        self.lock_wait = getattr(settings, 'ANONYMOUS_CACHE_LOCK_WAIT', 0.5)
+        self.beta = getattr(settings, 'ANONYMOUS_CACHE_BETA', 1.0)
+        self.skip_cookies = (settings.SESSION_COOKIE_NAME, 'messages')
+        # Параметры, которые читают кешируемые view; остальные в ключ не
+        # входят, иначе каждый ?x=1, ?x=2 хранил бы свою копию.
+        self.query_params = sorted(getattr(
+            settings, 'ANONYMOUS_CACHE_QUERY_PARAMS', ('page', 'cursor')))
+        version = getattr(settings, 'ANONYMOUS_CACHE_VERSION', None)
+        self.version = import_string(version) if version else None
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+        key = self.cache_key(request)
+        lock_key = f'{key}:lock'
+        entry = self.cache.get(key)
+        if entry is not None:
+            response, expires, delta = entry
+            if not self.should_refresh(expires, delta):
+                return self.hit(request, response, expires)
+            if not self.cache.add(lock_key, 1, self.lock_timeout):
+                # Пересборкой уже занят другой запрос.
+                return self.hit(request, response, expires)
+        elif not self.cache.add(lock_key, 1, self.lock_timeout):
+            entry = self.wait_for(key)
+            if entry is not None:
+                return self.hit(request, entry[0], entry[1])
+            return self.get_response(request)
+        try:
+            started = time.monotonic()
+            response = self.get_response(request)
+            delta = time.monotonic() - started
+            if self.is_cacheable_response(request, response):
+                self.store(key, response, delta)
+            response['X-Cache'] = 'MISS'
+            return response
+        finally:
+            self.cache.delete(lock_key)
+
+    def is_cacheable_request(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if any(name in request.COOKIES for name in self.skip_cookies):
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.view_name in self.url_names
+
+    def is_cacheable_response(self, request, response):
+        cache_control = response.get('Cache-Control', '')
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and 'private' not in cache_control
+            and 'no-store' not in cache_control
+        )
+
+    def cache_key(self, request):
+        query = urlencode([
+            (name, value)
+            for name in self.query_params
+            for value in request.GET.getlist(name)
+        ])
+        url = request.build_absolute_uri(request.path)
+        url = hashlib.md5(f'{url}?{query}'.encode()).hexdigest()
+        version = self.version() if self.version else ''
+        return f'anoncache:{version}:{url}'
+
+    def should_refresh(self, expires, delta):
+        """XFetch: чем дольше пересборка и ближе срок, тем вероятнее
+        обновить запись досрочно."""
+        jitter = -delta * self.beta * math.log(1 - random.random())
+        return time.time() + jitter >= expires
+
+    def wait_for(self, key):
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def store(self, key, response, delta):
+        patch_vary_headers(response, ('Cookie',))
+        patch_cache_control(response, public=True, max_age=self.timeout)
+        expires = time.time() + self.timeout
+        self.cache.set(
+            key, (response, expires, delta),
+            self.timeout + self.stale_timeout,
+        )
+
+    def hit(self, request, response, expires):
+        patch_cache_control(
+            response, max_age=max(0, int(expires - time.time())))
+        conditional = get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')),
+            response=response,
+        )
+        conditional['X-Cache'] = 'HIT'
+        return conditional
+
+
+class MetricsMiddleware:
+    """Собирает метрики запроса по имени маршрута для ``/metrics``.
+
+    Стоит вторым, после ``StaticFilesMiddleware``: статика в метрики не
+    попадает, а ответы ``AnonymousCacheMiddleware``, который стоит ниже,
+    учитываются.
+    Отключается настройкой ``METRICS_ENABLED = False``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        metrics.install_template_timer()
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        metrics.activate(request_metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics.execute))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate()
+        duration = time.perf_counter() - started
+        size = None if response.streaming else len(response.content)
+        metrics.registry.record(
+            self.view_name(request), response.status_code, duration,
+            request_metrics, size,
+        )
+        return response
+
+    def view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            # Ответ из кеша или от middleware: до URLconf дело не дошло.
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return metrics.UNRESOLVED
+        return match.view_name
+
+
+class SlowLogMiddleware:
+    """Журнал медленных SQL- и HTTP-запросов с request ID.
+
+    Запросу присваивается ID (или берётся корректный ``X-Request-ID`` от
+    прокси), он возвращается в заголовке ответа и попадает в каждую
+    запись журнала. Пороги — ``SLOW_QUERY_THRESHOLD_MS`` и
+    ``SLOW_REQUEST_THRESHOLD_MS``; ``None`` отключает журнал.
+    """
+
+    REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_threshold = getattr(
+            settings, 'SLOW_QUERY_THRESHOLD_MS', 100)
+        self.request_threshold = getattr(
+            settings, 'SLOW_REQUEST_THRESHOLD_MS', 1000)
+        self.log_params = getattr(settings, 'SLOW_QUERY_LOG_PARAMS', False)
+
+    def request_id(self, request):
+        incoming = request.META.get('HTTP_X_REQUEST_ID', '')
+        if self.REQUEST_ID_RE.match(incoming):
+            return incoming
+        return uuid.uuid4().hex
+
+    def __call__(self, request):
+        request.request_id = self.request_id(request)
+        timer = slowlog.QueryTimer(
+            request, self.query_threshold, self.log_params)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = (time.perf_counter() - started) * 1000
+        if (self.request_threshold is not None
+                and duration >= self.request_threshold):
+            slowlog.log_entry(
+                type='request',
+                request_id=request.request_id,
+                view=slowlog.view_name(request),
+                method=request.method,
+                path=request.get_full_path(),
+                status=response.status_code,
+                duration_ms=round(duration, 3),
+                queries=timer.queries,
+                db_ms=round(timer.db_ms, 3),
+            )
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+class ReplicaMiddleware:
+    """Разрешает ``ReplicaRouter`` читать с реплики в GET/HEAD-запросах.
+
+    После записи в небезопасном запросе (``post_create``, ``post_edit``)
+    ставит cookie ``REPLICA_PIN_COOKIE`` на ``REPLICA_PIN_SECONDS``:
+    пока реплика догоняет основную базу, этот пользователь читает из
+    основной и видит свои изменения. Без ``REPLICA_DATABASE`` не
+    подключается.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if routers.replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.cookie = getattr(settings, 'REPLICA_PIN_COOKIE', 'pin_primary')
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+    def __call__(self, request):
+        safe = request.method in self.SAFE_METHODS
+        replica = safe and self.cookie not in request.COOKIES
+        with routers.request_scope(replica) as state:
+            response = self.get_response(request)
+        # Ответы на GET может сохранить кеш анонимных страниц, поэтому
+        # cookie ставится только после небезопасных запросов.
+        if state.wrote and not safe:
+            response.set_cookie(
+                self.cookie, '1', max_age=self.pin_seconds, httponly=True,
+                samesite='Lax')
+        return response
+
+
+class ProfilerMiddleware:
+    """Профилирует запрос сотрудника с ``?_profile=1`` или заголовком
+    ``X-Profile: 1``.
+
+    Включается настройкой ``PROFILER_ENABLED``; выключенный не
+    подключается вовсе и ничего не стоит. Стоит после
+    AuthenticationMiddleware. Имя сохранённого профиля возвращается
+    в заголовке ``X-Profile-Id``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+
+    def wants_profile(self, request):
+        return (
+            request.GET.get('_profile') == '1'
+            or request.META.get('HTTP_X_PROFILE') == '1'
+        ) and request.user.is_staff
+
+    def __call__(self, request):
+        if not self.wants_profile(request):
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        response = profile.runcall(self.get_response, request)
+        duration = time.perf_counter() - started
+        request_id = getattr(request, 'request_id', None) or uuid.uuid4().hex
+        response['X-Profile-Id'] = profiler.save(
+            profile, request, response, duration, request_id)
+        return response
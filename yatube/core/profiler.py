@@ -0,0 +1,133 @@
+"""Сохранение и чтение профилей cProfile отдельных запросов.
+
+Профиль пишется файлом ``<имя>.prof`` в формате pstats (его открывают
+``python -m pstats`` и snakeviz), рядом лежит ``<имя>.json`` с
+описанием запроса и верхушкой функций по cumulative time, чтобы
+список профилей не разбирал сами профили.
+"""
+import json
+import os
+import pstats
+import re
+
+from django.conf import settings
+from django.utils import timezone
+
+NAME_RE = re.compile(r'^[\w.-]+$')
+TOP_FUNCTIONS = 10
+
+
+def profile_dir():
+    return settings.PROFILER_DIR
+
+
+def _function_label(func):
+    filename, line, name = func
+    # Путь до site-packages одинаков у всех строк и только мешает.
+    filename = filename.rsplit('site-packages/', 1)[-1]
+    return f'{name} ({filename}:{line})'
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    stats.sort_stats('cumulative')
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        _, calls, tottime, cumtime, _ = stats.stats[func]
+        rows.append({
+            'function': _function_label(func),
+            'calls': calls,
+            'tottime': round(tottime, 6),
+            'cumtime': round(cumtime, 6),
+        })
+    return rows
+
+
+def save(profiler, request, response, duration, request_id):
+    """Записывает профиль и описание, старые профили сверх
+    ``PROFILER_KEEP`` удаляются. Возвращает имя профиля."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match is not None else 'unresolved'
+    created = timezone.now()
+    name = '{}-{}-{}'.format(
+        created.strftime('%Y%m%d-%H%M%S-%f'),
+        re.sub(r'[^\w.-]', '_', view),
+        request_id,
+    )
+    profiler.dump_stats(os.path.join(directory, f'{name}.prof'))
+    meta = {
+        'name': name,
+        'created': created.isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': view,
+        'user': request.user.get_username(),
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'top': top_functions(pstats.Stats(profiler)),
+    }
+    with open(os.path.join(directory, f'{name}.json'), 'w',
+              encoding='utf-8') as stream:
+        json.dump(meta, stream, ensure_ascii=False)
+    prune(directory, getattr(settings, 'PROFILER_KEEP', 50))
+    return name
+
+
+def _names(directory):
+    try:
+        files = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    # Имена начинаются с метки времени: сортировка по имени — по дате.
+    return sorted(
+        (file[:-len('.json')] for file in files if file.endswith('.json')),
+        reverse=True,
+    )
+
+
+def prune(directory, keep):
+    for name in _names(directory)[keep:]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def recent(limit=None):
+    """Описания последних профилей, новые первыми."""
+    directory = profile_dir()
+    profiles = []
+    for name in _names(directory)[:limit]:
+        try:
+            with open(os.path.join(directory, f'{name}.json'),
+                      encoding='utf-8') as stream:
+                profiles.append(json.load(stream))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def stats_path(name):
+    """Путь к ``.prof`` или None для чужого или несуществующего имени."""
+    if not NAME_RE.match(name):
+        return None
+    path = os.path.join(profile_dir(), f'{name}.prof')
+    return path if os.path.isfile(path) else None
+
+
+def load(name, limit=50):
+    """Описание профиля с ``limit`` функциями или None, если профиля
+    нет или его описание потеряно (как в ``recent``)."""
+    path = stats_path(name)
+    if path is None:
+        return None
+    try:
+        with open(os.path.join(profile_dir(), f'{name}.json'),
+                  encoding='utf-8') as stream:
+            meta = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    meta['top'] = top_functions(pstats.Stats(path), limit)
+    return meta
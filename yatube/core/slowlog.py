@@ -0,0 +1,103 @@
+"""Журнал медленных SQL-запросов и HTTP-запросов.
+
+Каждая запись — одна JSON-строка в логгере ``yatube.slow``: её легко
+читать глазами, грепать по request_id и агрегировать командой
+``slow_queries``.
+"""
+import json
+import logging
+import re
+import time
+
+logger = logging.getLogger('yatube.slow')
+
+MAX_SQL_LENGTH = 4000
+MAX_PARAMS_LENGTH = 1000
+
+
+def _truncate(value, limit):
+    return value if len(value) <= limit else value[:limit] + '…'
+
+
+def log_entry(**fields):
+    logger.warning(json.dumps(fields, ensure_ascii=False, default=str))
+
+
+class QueryTimer:
+    """Обёртка ``execute_wrapper``: пишет в журнал запросы дольше порога
+    и копит общее время и число запросов для журнала HTTP-запроса."""
+
+    def __init__(self, request, threshold_ms, log_params=False):
+        self.request = request
+        self.threshold = threshold_ms
+        self.log_params = log_params
+        self.queries = 0
+        self.db_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.db_ms += duration
+            if self.threshold is not None and duration >= self.threshold:
+                self.log_query(sql, params, many, duration, context)
+
+    def log_query(self, sql, params, many, duration, context):
+        log_entry(
+            type='query',
+            request_id=self.request.request_id,
+            view=view_name(self.request),
+            method=self.request.method,
+            path=self.request.get_full_path(),
+            database=context['connection'].alias,
+            duration_ms=round(duration, 3),
+            sql=_truncate(sql, MAX_SQL_LENGTH),
+            # executemany передаёт список наборов — пишем только размер.
+            params=(
+                None if not self.log_params
+                else f'<{len(params)} rows>' if many
+                else _truncate(repr(params), MAX_PARAMS_LENGTH)
+            ),
+        )
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else None
+
+
+LITERALS = (
+    # Строки в кавычках, числа и плейсхолдеры превращаются в «?».
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    # IN (?, ?, ?) и многострочные VALUES схлопываются.
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize_sql(sql):
+    """Форма запроса без конкретных значений: по ней группируются
+    записи журнала."""
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def read_entries(lines):
+    """Записи журнала из строк; посторонние строки пропускаются."""
+    for line in lines:
+        start = line.find('{')
+        if start < 0:
+            continue
+        try:
+            entry = json.loads(line[start:])
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and 'type' in entry:
+            yield entry
@@ -0,0 +1,80 @@
+"""Хранилище статики с хешами в именах и заранее сжатыми копиями.
+
+``collectstatic`` кладёт в ``STATIC_ROOT`` файлы вида
+``css/bootstrap.min.<md5>.css`` и манифест ``staticfiles.json``, а для
+текстовых форматов — ещё и ``<имя>.gz``, если сжатие даёт выигрыш.
+Отдаёт их ``core.middleware.StaticFilesMiddleware``.
+"""
+import gzip
+import io
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.xml', '.json',
+    '.html',
+}
+# css/bootstrap.min.0123456789ab.css -> css/bootstrap.min + .css
+HASHED_NAME_RE = re.compile(
+    r'^(?P<base>.+)\.[0-9a-f]{12}(?P<ext>\.[^./]+)?$')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = super().post_process(paths, dry_run, **options)
+        if dry_run:
+            yield from processed
+            return
+        for name, hashed_name, done in processed:
+            if done and not isinstance(done, Exception):
+                # Сжимаются и оригинал, и копия с хешем: оба остаются
+                # доступными по своим адресам.
+                for path in {name, hashed_name}:
+                    self.compress(path)
+            yield name, hashed_name, done
+
+    def compress(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return
+        min_size = getattr(settings, 'STATIC_GZIP_MIN_SIZE', 256)
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < min_size:
+            return
+        # mtime=0: одинаковый файл даёт одинаковый .gz при каждой сборке.
+        # GzipFile, а не gzip.compress: у того mtime есть только с 3.8.
+        buffer = io.BytesIO()
+        with gzip.GzipFile(
+                fileobj=buffer, mode='wb', compresslevel=9, mtime=0) as gz:
+            gz.write(content)
+        compressed = buffer.getvalue()
+        if len(compressed) >= len(content):
+            return
+        gz_name = f'{name}.gz'
+        if self.exists(gz_name):
+            self.delete(gz_name)
+        self._save(gz_name, ContentFile(compressed))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # collectstatic ещё не запускали (разработка, тесты):
+            # файл найдут finders по исходному имени.
+            return name
+
+
+def is_hashed(storage, name):
+    """Имя с хешем из манифеста: содержимое по этому адресу не меняется
+    и его можно кешировать навсегда."""
+    match = HASHED_NAME_RE.match(name)
+    if match is None:
+        return False
+    original = match['base'] + (match['ext'] or '')
+    return getattr(storage, 'hashed_files', {}).get(original) == name
@@ -0,0 +1,69 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden,
+)
+from django.shortcuts import render
+
+from . import profiler
+from .metrics import registry
+
+
+def _has_metrics_token(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        return False
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def metrics(request):
+    """Метрики процесса в формате Prometheus.
+
+    Доступны сотрудникам и по заголовку ``Authorization: Bearer
+    <METRICS_TOKEN>`` (``bearer_token`` в настройках Prometheus). Адрес
+    клиента не проверяется: за обратным прокси все запросы приходят с
+    127.0.0.1.
+    """
+    if not (request.user.is_staff or _has_metrics_token(request)):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4')
+
+
+def _profiler_enabled():
+    if not getattr(settings, 'PROFILER_ENABLED', False):
+        raise Http404
+
+
+@staff_member_required
+def profiler_index(request):
+    """Последние профили с самыми дорогими функциями."""
+    _profiler_enabled()
+    return render(request, 'core/profiler_index.html', {
+        'profiles': profiler.recent(),
+    })
+
+
+@staff_member_required
+def profiler_detail(request, name):
+    _profiler_enabled()
+    profile = profiler.load(name)
+    if profile is None:
+        raise Http404
+    return render(request, 'core/profiler_detail.html', {
+        'profile': profile,
+    })
+
+
+@staff_member_required
+def profiler_download(request, name):
+    """Файл pstats для ``python -m pstats`` или snakeviz."""
+    _profiler_enabled()
+    path = profiler.stats_path(name)
+    if path is None:
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True, filename=f'{name}.prof')
@@ -4,7 +4,11 @@ import sys
 
 
 def main():
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    # Тесты по умолчанию берут свои настройки: отдельный кеш в памяти.
+    settings_module = (
+        'yatube.settings_test' if sys.argv[1:2] == ['test']
+        else 'yatube.settings')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
 
     try:
 
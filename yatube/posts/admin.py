@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .fts import fts_available
 from .models import Group, Post
+from .search import build_match, filter_matching
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,6 +18,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE '%term%' по всей таблице ищем через индекс FTS5.
+        if not build_match(search_term) or not fts_available():
+            return super().get_search_results(
+                request, queryset, search_term)
+        return filter_matching(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,174 @@
+"""Read-only JSON API ленты, групп, профилей и постов.
+
+Страницы выбираются курсором по (pub_date, id), из базы читаются только
+колонки из ``?fields=``, а ответы не проходят через шаблоны.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from .fragments import scope_version
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+
+# Имя поля в API -> колонка для .values().
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+DEFAULT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+# Нужны курсору, даже если клиент их не просил.
+KEY_COLUMNS = ('pub_date', 'id')
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _json_response(body, status=200):
+    return HttpResponse(
+        body, content_type='application/json; charset=utf-8', status=status)
+
+
+def api_view(view):
+    """Только GET/HEAD; ошибки отдаются JSON, а не HTML-страницей."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return _json_response(
+                _dumps({'detail': error.detail}), status=error.status)
+    return wrapper
+
+
+def _fetch_one(model, **lookup):
+    obj = model.objects.filter(**lookup).only('pk').first()
+    if obj is None:
+        raise ApiError('Не найдено.', status=404)
+    return obj
+
+
+def parse_fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(FIELDS)}.')
+    return fields
+
+
+def parse_limit(request):
+    raw = request.GET.get('limit')
+    if raw is None:
+        return PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ApiError('limit должен быть числом.')
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+def _columns(fields, extra=()):
+    return list(dict.fromkeys(
+        [FIELDS[name] for name in fields] + list(extra)))
+
+
+def _serialize(row, fields):
+    return {name: row[FIELDS[name]] for name in fields}
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def _list_response(request, queryset, scope, pk=None):
+    """Страница постов области; ETag зависит от версии области и URL,
+    поэтому повторный запрос без изменений получает 304 без SELECT
+    по постам."""
+    fields = parse_fields(request)
+    limit = parse_limit(request)
+    version = scope_version(scope, pk)
+    etag = quote_etag(hashlib.md5(
+        f'{version}|{request.get_full_path()}'.encode()).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+        return response
+    rows = queryset.order_by('-pub_date', '-id').values(
+        *_columns(fields, KEY_COLUMNS))
+    page = CursorPaginator(rows, limit).page(request.GET.get('cursor'))
+    data = {
+        'results': [_serialize(row, fields) for row in page],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    }
+    response = _json_response(_dumps(data))
+    response['ETag'] = etag
+    return response
+
+
+@api_view
+def post_list(request):
+    return _list_response(request, Post.objects.all(), 'all')
+
+
+@api_view
+def group_post_list(request, slug):
+    group = _fetch_one(Group, slug=slug)
+    return _list_response(
+        request, Post.objects.filter(group_id=group.pk), 'group', group.pk)
+
+
+@api_view
+def profile_post_list(request, username):
+    author = _fetch_one(User, username=username)
+    return _list_response(
+        request, Post.objects.filter(author_id=author.pk),
+        'author', author.pk)
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request)
+    row = Post.objects.filter(pk=post_id).values(*_columns(fields)).first()
+    if row is None:
+        raise ApiError('Не найдено.', status=404)
+    body = _dumps(_serialize(row, fields))
+    # Ответ короткий: ETag — хеш самого тела, он учитывает и правку
+    # поста, и переименование группы.
+    etag = quote_etag(hashlib.md5(body.encode()).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _json_response(body)
+    response['ETag'] = etag
+    return response
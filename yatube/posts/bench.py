@@ -0,0 +1,160 @@
+import math
+import random
+import statistics
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from .models import AuthorStats, Group, Post, User
+from .utils import preserve_pub_date
+
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'ту', 'ле', 'на', 'зо', 'ви', 'шу', 'пе', 'да', 'бо',
+    'ря', 'ги', 'сэ', 'фу', 'жа', 'хо', 'цу', 'ни',
+)
+# Синтетический словарь из 8000 «слов» с частотами по закону Ципфа,
+# как в живых текстах: несколько частых слов и длинный хвост редких.
+WORDS = [
+    a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES
+]
+CUM_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+
+
+def post_text(rng, words=12):
+    return ' '.join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=words))
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback():
+    """Выполняет блок в транзакции и откатывает её: база остаётся чистой."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def populate(count, authors=10, groups=5, batch_size=5000, log=None):
+    """Создаёт ``count`` постов с датами, идущими в прошлое по секунде."""
+    users = [
+        User.objects.create_user(username=f'bench_user_{i}')
+        for i in range(authors)
+    ]
+    group_objs = [
+        Group.objects.create(title=f'Bench {i}', slug=f'bench-{i}')
+        for i in range(groups)
+    ]
+    rng = random.Random(0)
+    start = timezone.now()
+    with preserve_pub_date():
+        for offset in range(0, count, batch_size):
+            batch = [
+                Post(
+                    text=post_text(rng),
+                    author=users[i % authors],
+                    group=group_objs[i % groups] if groups else None,
+                    pub_date=start - timedelta(seconds=i),
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            Post.objects.bulk_create(batch)
+            if log is not None:
+                log(f'{offset + len(batch)}/{count}')
+    return users, group_objs
+
+
+def generate_dataset(users=100, groups=20, posts=10_000, seed=0,
+                     batch_size=5000, log=None):
+    """Детерминированный набор данных для нагрузочных замеров.
+
+    Одинаковый ``seed`` даёт одинаковых пользователей, группы и посты
+    (включая даты), поэтому отчёты разных прогонов сравнимы. Авторство
+    распределено по Ципфу: немного активных авторов и много редких.
+    Всё пишется через bulk_create, счётчики AuthorStats заполняются
+    отдельно.
+    """
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    # Пароль неиспользуемый: хеширование сотен паролей заняло бы
+    # больше времени, чем вставка миллиона постов.
+    password = make_password(None)
+    user_objs = User.objects.bulk_create([
+        User(
+            username=f'{fake.user_name()}_{i}',
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            password=password,
+        )
+        for i in range(users)
+    ])
+    # bulk_create на SQLite не возвращает id: перечитываем по порядку.
+    user_objs = list(User.objects.filter(
+        username__in=[user.username for user in user_objs]).order_by('id'))
+    group_objs = Group.objects.bulk_create([
+        Group(
+            title=fake.catch_phrase()[:200],
+            slug=f'load-{i}',
+            description=fake.paragraph(),
+        )
+        for i in range(groups)
+    ])
+    group_objs = list(Group.objects.filter(
+        slug__in=[group.slug for group in group_objs]).order_by('id'))
+    author_weights = list(accumulate(
+        1 / rank for rank in range(1, len(user_objs) + 1)))
+    start = timezone.make_aware(datetime(2021, 1, 1))
+    counts = Counter()
+    with preserve_pub_date():
+        for offset in range(0, posts, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, posts)):
+                author = rng.choices(user_objs, cum_weights=author_weights)[0]
+                group = None
+                if group_objs and rng.random() < 0.7:
+                    group = rng.choice(group_objs)
+                counts[author.pk] += 1
+                batch.append(Post(
+                    text=post_text(rng, words=rng.randint(5, 60)),
+                    author=author,
+                    group=group,
+                    pub_date=start - timedelta(minutes=i),
+                ))
+            Post.objects.bulk_create(batch)
+            if log is not None:
+                log(f'{offset + len(batch)}/{posts}')
+    AuthorStats.objects.bulk_create([
+        AuthorStats(author=user, posts_count=counts[user.pk])
+        for user in user_objs
+    ])
+    return user_objs, group_objs
+
+
+def percentile(samples, fraction):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def timed(func, repeat=5):
+    """Медианное время выполнения ``func`` в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Min
+from django.utils.functional import cached_property
+
+from .models import AuthorStats, Post
+
+COUNT_TIMEOUT = getattr(settings, 'POSTS_COUNT_CACHE_TIMEOUT', 60)
+
+
+def count_key(scope, pk=None):
+    if pk is None:
+        return f'posts:count:{scope}'
+    return f'posts:count:{scope}:{pk}'
+
+
+def _cached_count(key, compute):
+    count = cache.get(key)
+    if count is None:
+        count = compute()
+        # add, а не set: не затираем значение, которое уже записал и
+        # сдвинул другой запрос. Атомарности нет: сигнал, пришедший между
+        # SELECT COUNT и add, не найдёт ключа, и в кеш ляжет старое
+        # число. Поэтому срок короткий — он и ограничивает такую ошибку.
+        cache.add(key, count, COUNT_TIMEOUT)
+    return count
+
+
+def _approximate_feed_count():
+    """Оценка размера ленты по диапазону первичных ключей.
+
+    MIN/MAX по id читаются из индекса за O(log n); удалённые посты
+    завышают оценку, поэтому последние страницы могут оказаться пустыми.
+    """
+    bounds = Post.objects.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return 0
+    return bounds['last'] - bounds['first'] + 1
+
+
+def feed_count():
+    if getattr(settings, 'POSTS_APPROXIMATE_FEED_COUNT', False):
+        return _cached_count(count_key('all'), _approximate_feed_count)
+    return _cached_count(count_key('all'), Post.objects.count)
+
+
+def author_count(author):
+    """Число постов автора из AuthorStats.
+
+    Загружайте автора с ``select_related('stats')``, тогда чтение не
+    стоит ни одного запроса. Пока строки нет (до backfill_post_counts),
+    посты считаются напрямую.
+    """
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return author.posts.count()
+
+
+def group_count(group_id):
+    return _cached_count(
+        count_key('group', group_id),
+        Post.objects.filter(group_id=group_id).count,
+    )
+
+
+def change_count(delta, *keys):
+    """Сдвигает закешированные счётчики, не пересчитывая их.
+
+    Отсутствующий в кеше ключ пропускаем: его посчитает первый читатель.
+    """
+    for key in keys:
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+
+
+class CountedPaginator(Paginator):
+    """Paginator, который берёт общее число объектов из ``count_func``
+    вместо ``SELECT COUNT(*)`` на каждый запрос."""
+
+    def __init__(self, object_list, per_page, count_func, page_class=Page,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count_func = count_func
+        self.page_class = page_class
+
+    def _get_page(self, *args, **kwargs):
+        return self.page_class(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        return self._count_func()
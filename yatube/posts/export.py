@@ -0,0 +1,46 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Колонки совпадают с форматом import_posts, так что выгрузку
+# можно загрузить обратно.
+FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+COLUMNS = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки; в памяти одновременно не больше ``chunk_size``."""
+    rows = (
+        queryset.order_by('pub_date', 'id')
+        .values_list(*COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield dict(zip(FIELDS, row))
+
+
+class _Echo:
+    """Файлоподобный объект, который отдаёт записанное обратно."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+FORMATS = {
+    'csv': (render_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (render_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
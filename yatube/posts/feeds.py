@@ -0,0 +1,164 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from .fragments import fragment_key
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+FEED_TIMEOUT = getattr(settings, 'POSTS_FEED_CACHE_TIMEOUT', 60 * 60)
+
+
+class PostsFeed(Feed):
+    """RSS последних постов всей ленты.
+
+    Готовый XML лежит в кеше под версией области ленты (см.
+    ``posts.fragments``), поэтому пересобирается только после того,
+    как в этой ленте появится или изменится пост. Last-Modified равен
+    дате самого свежего поста и вместе с ETag отвечает на условные
+    запросы кодом 304.
+    """
+
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов Yatube.'
+    scope = 'all'
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404('Feed object does not exist.')
+        # В XML абсолютные ссылки: копия для одного хоста или схемы не
+        # годится для другого.
+        origin = f'{request.scheme}://{request.get_host()}'
+        key = fragment_key(
+            f'feed:{self.feed_type.__name__}', f'xml:{origin}',
+            *self.scope_of(obj))
+        cached = cache.get(key)
+        if cached is None:
+            feedgen = self.get_feed(obj, request)
+            cached = (
+                feedgen.writeString('utf-8'),
+                timegm(feedgen.latest_post_date().utctimetuple()),
+                feedgen.content_type,
+            )
+            cache.set(key, cached, FEED_TIMEOUT)
+        content, last_modified, content_type = cached
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def scope_of(self, obj):
+        return (self.scope,)
+
+    def link(self):
+        return reverse('post:main')
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return (
+            self.get_posts(obj)
+            .select_related('author', 'group')
+            .order_by('-pub_date', '-id')[:FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return f'{item.author.username}: {item.text[:50]}'
+
+    def item_description(self, item):
+        return item.text
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse(
+            'post:profile', kwargs={'username': item.author.username})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_categories(self, item):
+        if item.group is None:
+            return ()
+        return (item.group.title,)
+
+
+class GroupPostsFeed(PostsFeed):
+    scope = 'group'
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def scope_of(self, group):
+        return self.scope, group.pk
+
+    def title(self, group):
+        return f'Yatube: записи группы {group.title}'
+
+    def description(self, group):
+        return group.description or self.title(group)
+
+    def link(self, group):
+        return group.get_absolute_url()
+
+    def get_posts(self, group):
+        return Post.objects.filter(group=group)
+
+
+class AuthorPostsFeed(PostsFeed):
+    scope = 'author'
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def scope_of(self, author):
+        return self.scope, author.pk
+
+    def title(self, author):
+        return f'Yatube: записи пользователя {author.username}'
+
+    def description(self, author):
+        return self.title(author)
+
+    def link(self, author):
+        return reverse('post:profile', kwargs={'username': author.username})
+
+    def get_posts(self, author):
+        return author.posts.all()
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class PostsAtomFeed(AtomFeedMixin, PostsFeed):
+    pass
+
+
+class GroupPostsAtomFeed(AtomFeedMixin, GroupPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
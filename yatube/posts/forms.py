@@ -1,6 +1,20 @@
 from django import forms
+from django.template.defaultfilters import filesizeformat
 
 from .models import Post
+from .uploads import max_upload_size
+
+
+class LimitedImageField(forms.ImageField):
+    def to_python(self, data):
+        # Размер проверяется до того, как Pillow начнёт читать файл.
+        if data and data.size > max_upload_size():
+            raise forms.ValidationError(
+                'Картинка больше %(limit)s.',
+                code='too_large',
+                params={'limit': filesizeformat(max_upload_size())},
+            )
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
@@ -10,12 +24,15 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ['text', 'group']
-        label = {
+        fields = ['text', 'group', 'image']
+        field_classes = {'image': LimitedImageField}
+        labels = {
             'text': 'Содержание',
             'group': 'Группа',
+            'image': 'Картинка',
         }
-        help_text = {
+        help_texts = {
             'text': 'Текст поста',
-            'group': 'Группа,к которой будет относиться пост',
+            'group': 'Группа, к которой будет относиться пост',
+            'image': 'Картинка к посту',
         }
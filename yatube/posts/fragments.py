@@ -0,0 +1,74 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.metrics import registry
+
+FRAGMENT_TIMEOUT = getattr(settings, 'POSTS_FRAGMENT_CACHE_TIMEOUT', 60 * 5)
+FRAGMENT_METRIC = 'yatube_fragment_cache_total'
+
+
+def _version_key(scope, pk=None):
+    if pk is None:
+        return f'posts:fragver:{scope}'
+    return f'posts:fragver:{scope}:{pk}'
+
+
+def scope_version(scope, pk=None):
+    """Текущая версия области ленты: всей ленты, автора или группы.
+
+    Версия — случайная строка, а не счётчик: если ключ вытеснят из
+    кеша, новая версия не совпадёт ни с одной из старых.
+    """
+    key = _version_key(scope, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def feed_version():
+    """Версия всей ленты: меняется при любом изменении постов и групп."""
+    return scope_version('all')
+
+
+def bump(scope, pk=None):
+    """Инвалидирует все фрагменты области одной записью в кеш."""
+    cache.set(_version_key(scope, pk), uuid.uuid4().hex, None)
+
+
+def bump_posts(author_ids=(), group_ids=()):
+    """Сбрасывает ленту и страницы затронутых авторов и групп."""
+    bump('all')
+    for author_id in set(author_ids) - {None}:
+        bump('author', author_id)
+    for group_id in set(group_ids) - {None}:
+        bump('group', group_id)
+
+
+def fragment_key(view, page, scope, pk=None):
+    """Ключ разметки страницы ``page`` (номер или курсор) области."""
+    return f'posts:fragment:{view}:{scope_version(scope, pk)}:{page}'
+
+
+def get_or_render(key, render):
+    # Статистика живёт в памяти процесса: запись в общий кеш на каждый
+    # фрагмент стоила бы блокировки записи на каждый просмотр.
+    html = cache.get(key)
+    if html is not None:
+        registry.count(FRAGMENT_METRIC, result='hit')
+        return html
+    registry.count(FRAGMENT_METRIC, result='miss')
+    html = render()
+    cache.set(key, html, FRAGMENT_TIMEOUT)
+    return html
+
+
+def fragment_stats():
+    """Попадания и промахи кеша фрагментов в этом процессе."""
+    return {
+        'hits': registry.value(FRAGMENT_METRIC, result='hit'),
+        'misses': registry.value(FRAGMENT_METRIC, result='miss'),
+    }
@@ -0,0 +1,62 @@
+from django.db import connection
+
+FTS_TABLE = 'posts_post_fts'
+
+# Внешний контент: FTS5 хранит только индекс, текст берётся из posts_post.
+# Триггеры держат индекс в согласии с таблицей при любых записях,
+# включая bulk_create и QuerySet.update.
+INSTALL_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='posts_post', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+UNINSTALL_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def fts_available(db=connection):
+    return db.vendor == 'sqlite'
+
+
+def install_fts(db=connection, rebuild=True):
+    """Создаёт FTS-таблицу и триггеры, если их нет.
+
+    SQLite пересоздаёт posts_post при изменении схемы в миграциях, и
+    триггеры при этом пропадают, поэтому такие миграции вызывают
+    install_fts повторно.
+    """
+    if not fts_available(db):
+        return
+    with db.cursor() as cursor:
+        for sql in INSTALL_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(REBUILD_SQL)
+
+
+def uninstall_fts(db=connection):
+    if not fts_available(db):
+        return
+    with db.cursor() as cursor:
+        for sql in UNINSTALL_SQL:
+            cursor.execute(sql)
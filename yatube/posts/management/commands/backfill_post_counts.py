@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import AuthorStats, Post, User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает AuthorStats.posts_count для всех авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        counts = (
+            Post.objects.filter(author=OuterRef('author'))
+            .order_by()
+            .values('author')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        with transaction.atomic():
+            # Строки не удаляем: в них хранятся и другие счётчики, а у
+            # авторов без постов должен остаться честный ноль.
+            updated = AuthorStats.objects.update(
+                posts_count=Coalesce(Subquery(counts), 0))
+            missing = User.objects.filter(stats__isnull=True).annotate(
+                total=Count('posts')).values_list('pk', 'total')
+            created = AuthorStats.objects.bulk_create(
+                (
+                    AuthorStats(author_id=author_id, posts_count=total)
+                    for author_id, total in missing.iterator()
+                ),
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(f'Обновлено авторов: {updated + len(created)}')
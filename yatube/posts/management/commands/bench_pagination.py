@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts.bench import populate, rollback, timed
+from posts.models import Post
+from posts.paginators import NEXT, CursorPaginator, encode_cursor
+from posts.views import AMOUNT_POST
+
+PAGES = (1, 10, 100, 1000, 10000)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает OFFSET- и курсорную пагинацию главной ленты. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rollback():
+            self.stdout.write(f'Создаю {options["posts"]} постов...')
+            populate(options['posts'])
+            post_list = Post.objects.order_by('-pub_date', '-id')
+            paginator = Paginator(post_list, AMOUNT_POST)
+            cursor_paginator = CursorPaginator(post_list, AMOUNT_POST)
+            self.stdout.write(f'{"page":>8} {"offset, ms":>12} '
+                              f'{"cursor, ms":>12}')
+            for number in PAGES:
+                if number > paginator.num_pages:
+                    break
+                cursor = None
+                if number > 1:
+                    # Курсор указывает на последний пост предыдущей
+                    # страницы; его поиск в замер не входит.
+                    boundary = post_list[(number - 1) * AMOUNT_POST - 1]
+                    cursor = encode_cursor(
+                        NEXT, boundary.pub_date, boundary.pk)
+                offset_ms = timed(
+                    lambda: list(paginator.page(number).object_list),
+                    options['repeat'],
+                )
+                cursor_ms = timed(
+                    lambda: list(cursor_paginator.page(cursor)),
+                    options['repeat'],
+                )
+                self.stdout.write(
+                    f'{number:>8} {offset_ms:>12.2f} {cursor_ms:>12.2f}')
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+
+from posts.bench import WORDS, populate, rollback, timed
+from posts.fts import fts_available
+from posts.models import Post
+from posts.search import SearchResults
+from posts.views import AMOUNT_POST
+
+# Частое, среднее и редкое слово словаря и запрос из двух слов.
+QUERIES = (
+    WORDS[0],
+    WORDS[50],
+    WORDS[2000],
+    f'{WORDS[10]} {WORDS[100]}',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск через icontains и через FTS5: первая страница '
+        'выдачи вместе с подсчётом. Данные откатываются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite.')
+        with rollback():
+            self.stdout.write(f'Создаю {options["posts"]} постов...')
+            populate(options['posts'])
+            self.stdout.write(
+                f'{"query":<20} {"icontains, ms":>14} {"fts5, ms":>10}')
+            for query in QUERIES:
+                like = Post.objects.order_by('-pub_date', '-id')
+                for term in query.split():
+                    like = like.filter(text__icontains=term)
+                like_ms = timed(
+                    lambda: list(Paginator(like, AMOUNT_POST).page(1)),
+                    options['repeat'],
+                )
+                fts_ms = timed(
+                    lambda: list(Paginator(
+                        SearchResults(query), AMOUNT_POST).page(1)),
+                    options['repeat'],
+                )
+                self.stdout.write(
+                    f'{query:<20} {like_ms:>14.2f} {fts_ms:>10.2f}')
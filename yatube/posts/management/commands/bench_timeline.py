@@ -0,0 +1,142 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import timeline
+from posts.bench import post_text, rollback, timed
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.paginators import NEXT, CursorPaginator, encode_cursor
+from posts.utils import preserve_pub_date
+from posts.views import AMOUNT_POST
+
+PAGES = (1, 10, 100, 1000)
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленту подписок, собранную JOIN по подпискам при '
+        'чтении, с заранее разложенной таблицей TimelineEntry, и '
+        'замеряет раскладку одного поста. Данные создаются во временной '
+        'транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follows', type=int, default=10_000,
+            help='На скольких авторов подписан читатель.',
+        )
+        parser.add_argument(
+            '--posts-per-author', type=int, default=5,
+        )
+        parser.add_argument(
+            '--followers', type=int, default=timeline.FANOUT_LIMIT,
+            help='Подписчиков у автора в замере раскладки.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rollback():
+            self.stdout.write(
+                f'Создаю {options["follows"]} авторов и по '
+                f'{options["posts_per_author"]} постов...')
+            reader = self.populate(
+                options['follows'], options['posts_per_author'])
+            self.compare_reads(reader, options['repeat'])
+            self.measure_fan_out(options['followers'], options['repeat'])
+
+    def bulk_users(self, prefix, count):
+        # Пароль неиспользуемый: хешировать тысячи паролей незачем.
+        password = make_password(None)
+        for offset in range(0, count, BATCH_SIZE):
+            User.objects.bulk_create([
+                User(username=f'{prefix}_{i}', password=password)
+                for i in range(offset, min(offset + BATCH_SIZE, count))
+            ])
+        # bulk_create на SQLite не возвращает id: перечитываем.
+        return list(User.objects.filter(
+            username__startswith=f'{prefix}_').values_list('id', flat=True))
+
+    def populate(self, follows, posts_per_author):
+        reader = User.objects.create_user(username='bench_reader')
+        authors = self.bulk_users('bench_author', follows)
+        # bulk_create не шлёт сигналов: подписки и ленту заполняем сами,
+        # как их заполнила бы раскладка.
+        Follow.objects.bulk_create(
+            [Follow(user=reader, author_id=author) for author in authors])
+        rng = random.Random(0)
+        start = timezone.now()
+        number = 0
+        with preserve_pub_date():
+            for offset in range(0, len(authors), BATCH_SIZE // 10):
+                batch = []
+                for author in authors[offset:offset + BATCH_SIZE // 10]:
+                    for _ in range(posts_per_author):
+                        batch.append(Post(
+                            author_id=author,
+                            text=post_text(rng),
+                            pub_date=start - timedelta(seconds=number),
+                        ))
+                        number += 1
+                Post.objects.bulk_create(batch)
+        posts = Post.objects.filter(author_id__in=Follow.objects.filter(
+            user=reader).values('author_id')).values_list(
+            'id', 'author_id', 'pub_date')
+        batch = []
+        for post_id, author_id, pub_date in posts.iterator():
+            batch.append(TimelineEntry(
+                user=reader, post_id=post_id,
+                author_id=author_id, pub_date=pub_date))
+            if len(batch) >= BATCH_SIZE:
+                TimelineEntry.objects.bulk_create(batch)
+                batch = []
+        TimelineEntry.objects.bulk_create(batch)
+        return reader
+
+    def compare_reads(self, reader, repeat):
+        joined = Post.objects.filter(
+            author__following__user=reader,
+        ).select_related('author', 'group')
+        paginator = CursorPaginator(joined, AMOUNT_POST)
+        ordered = joined.order_by('-pub_date', '-id')
+        self.stdout.write(f'{"page":>8} {"join, ms":>12} '
+                          f'{"timeline, ms":>14}')
+        for number in PAGES:
+            cursor = None
+            if number > 1:
+                # Курсор — последний пост предыдущей страницы; его поиск
+                # в замер не входит.
+                boundary = ordered[(number - 1) * AMOUNT_POST - 1:][:1]
+                if not boundary:
+                    break
+                cursor = encode_cursor(
+                    NEXT, boundary[0].pub_date, boundary[0].pk)
+            join_ms = timed(
+                lambda: list(paginator.page(cursor)), repeat)
+            timeline_ms = timed(
+                lambda: list(timeline.page(reader, cursor, AMOUNT_POST)),
+                repeat,
+            )
+            self.stdout.write(
+                f'{number:>8} {join_ms:>12.2f} {timeline_ms:>14.2f}')
+
+    def measure_fan_out(self, followers, repeat):
+        author = User.objects.create_user(username='bench_popular')
+        Follow.objects.bulk_create(
+            [Follow(user_id=user, author=author)
+             for user in self.bulk_users('bench_follower', followers)])
+        posts = []
+
+        def publish():
+            # Раскладка идёт в сигнале post_save.
+            posts.append(Post.objects.create(author=author, text='Пост'))
+
+        publish_ms = timed(publish, repeat)
+        created = TimelineEntry.objects.filter(author=author).count()
+        self.stdout.write(
+            f'Публикация поста автора с {followers} подписчиками: '
+            f'{publish_ms:.2f} ms, строк ленты {created // len(posts)} '
+            f'на пост')
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты автора, группы или всей ленты '
+        'в CSV или JSONL.'
+    )
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument('--author', help='username автора.')
+        scope.add_argument('--group', help='slug группы.')
+        parser.add_argument(
+            '--format', choices=tuple(export.FORMATS), default='jsonl')
+        parser.add_argument(
+            '--output', default='-', help='Путь к файлу или «-» для stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        elif options['group']:
+            queryset = queryset.filter(group__slug=options['group'])
+        render_rows, _ = export.FORMATS[options['format']]
+        chunks = render_rows(
+            export.export_rows(queryset, options['chunk_size']))
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        try:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
+        except OSError as error:
+            raise CommandError(error)
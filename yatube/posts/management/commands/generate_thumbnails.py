@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import fragments, thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее создаёт миниатюры картинок постов, чтобы страницы их '
+        'только читали. По умолчанию обрабатывает посты, изменённые '
+        'за последние --since минут; с --watch работает как воркер.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пройти по всем постам с картинками.',
+        )
+        parser.add_argument(
+            '--since', type=int, default=60,
+            help='Окно в минутах для первого прохода.',
+        )
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Не завершаться, а проверять новые посты каждые '
+                 '--interval секунд.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        since = None
+        if not options['all']:
+            since = timezone.now() - timedelta(
+                minutes=options['since'])
+        while True:
+            started = timezone.now()
+            done = self.process(since)
+            if done or not options['watch']:
+                self.stdout.write(f'Готово миниатюр: {done}')
+            if not options['watch']:
+                return
+            since = started
+            time.sleep(options['interval'])
+
+    def process(self, since):
+        posts = Post.objects.exclude(image='').only(
+            'id', 'image', 'author_id', 'group_id')
+        if since is not None:
+            posts = posts.filter(updated_at__gte=since)
+        done = 0
+        authors, groups = set(), set()
+        for post in posts.iterator():
+            try:
+                thumbnails.generate(post.image)
+            except Exception as error:
+                # Битая картинка не должна останавливать воркер.
+                self.stderr.write(f'Пост {post.pk}: {error}')
+                continue
+            done += 1
+            authors.add(post.author_id)
+            groups.add(post.group_id)
+        if done:
+            # В кеше лежат страницы со ссылками на оригиналы.
+            fragments.bump_posts(authors, groups)
+        return done
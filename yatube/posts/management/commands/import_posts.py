@@ -0,0 +1,226 @@
+import csv
+import json
+import sys
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import fragments, timeline
+from posts.counters import count_key
+from posts.models import AuthorStats, Group, Post, User
+from posts.utils import preserve_pub_date
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+def read_rows(stream, fmt):
+    """Построчно читает записи, не загружая файл в память."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # Битая строка или не объект ([], 1, "x") пропускается так же,
+        # как строка без текста.
+        yield row if isinstance(row, dict) else {}
+
+
+def is_valid(row):
+    """Поля — строки или отсутствуют: ["a"] или 1 в author не ищутся."""
+    return all(
+        row.get(field) is None or isinstance(row[field], str)
+        for field in FIELDS
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает посты из JSONL или CSV (файл или «-» для '
+        'stdin). Поля: text, author (username), group (slug), pub_date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Размер одного INSERT внутри bulk_create.',
+        )
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать отсутствующих авторов вместо пропуска строк.',
+        )
+        parser.add_argument(
+            '--create-groups', action='store_true',
+            help='Создавать отсутствующие группы вместо пропуска строк.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'csv' if path.endswith('.csv') else 'jsonl'
+        self.options = options
+        self.authors = {}
+        self.groups = {}
+        self.author_deltas = Counter()
+        self.touched_groups = set()
+        self.imported = self.skipped = 0
+        self.started = time.monotonic()
+        # bulk_create в SQLite не возвращает id: новые посты — те, что
+        # получили id больше этого.
+        self.last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        if path == '-':
+            self.load(sys.stdin, fmt)
+        else:
+            try:
+                with open(path, encoding='utf-8', newline='') as stream:
+                    self.load(stream, fmt)
+            except OSError as error:
+                raise CommandError(error)
+        self.report(final=True)
+
+    def load(self, stream, fmt):
+        batch = []
+        with preserve_pub_date():
+            for row in read_rows(stream, fmt):
+                batch.append(row)
+                if len(batch) >= self.options['batch_size']:
+                    self.insert(batch)
+                    batch = []
+            if batch:
+                self.insert(batch)
+
+    def resolve(self, cache_map, model, field, keys, create):
+        """Дополняет карту ``значение -> id`` одним запросом на пачку."""
+        missing = {key for key in keys if key and key not in cache_map}
+        if not missing:
+            return
+        found = model.objects.filter(**{f'{field}__in': missing})
+        cache_map.update(found.values_list(field, 'id'))
+        for key in missing - cache_map.keys():
+            if create:
+                cache_map[key] = create(key).id
+
+    def create_author(self, username):
+        return User.objects.create_user(username=username)
+
+    def create_group(self, slug):
+        return Group.objects.create(title=slug, slug=slug)
+
+    def insert(self, rows):
+        valid = [row for row in rows if is_valid(row)]
+        self.skipped += len(rows) - len(valid)
+        rows = valid
+        self.resolve(
+            self.authors, User, 'username',
+            {row.get('author') for row in rows},
+            self.options['create_authors'] and self.create_author,
+        )
+        self.resolve(
+            self.groups, Group, 'slug',
+            {row.get('group') for row in rows},
+            self.options['create_groups'] and self.create_group,
+        )
+        posts = []
+        now = timezone.now()
+        for row in rows:
+            post = self.build(row, now)
+            if post is None:
+                self.skipped += 1
+                continue
+            posts.append(post)
+            self.author_deltas[post.author_id] += 1
+            if post.group_id is not None:
+                self.touched_groups.add(post.group_id)
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                posts, batch_size=self.options['chunk_size'])
+        self.imported += len(posts)
+        # После каждой пачки: если импорт оборвётся, счётчики и кеш
+        # уже соответствуют загруженным постам.
+        self.sync_counters()
+        self.report()
+
+    def build(self, row, now):
+        text = row.get('text')
+        author_id = self.authors.get(row.get('author'))
+        if not text or author_id is None:
+            return None
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                return None
+        pub_date = now
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+                if pub_date is not None and timezone.is_naive(pub_date):
+                    pub_date = timezone.make_aware(pub_date)
+            except (ValueError, OverflowError):
+                # Формат верный, а даты нет: 2020-02-30.
+                return None
+            if pub_date is None:
+                return None
+        return Post(
+            text=text,
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+        )
+
+    def sync_counters(self):
+        """bulk_create не шлёт сигналы: правим счётчики и кеш сами."""
+        with transaction.atomic():
+            for author_id, delta in self.author_deltas.items():
+                updated = AuthorStats.objects.filter(
+                    author_id=author_id).update(
+                        posts_count=F('posts_count') + delta)
+                if not updated:
+                    AuthorStats.objects.create(
+                        author_id=author_id,
+                        posts_count=Post.objects.filter(
+                            author_id=author_id).count(),
+                    )
+        cache.delete_many(
+            [count_key('all')]
+            + [count_key('group', pk) for pk in self.touched_groups]
+        )
+        fragments.bump_posts(self.author_deltas, self.touched_groups)
+        new_posts = Post.objects.filter(id__gt=self.last_id)
+        last_id = new_posts.aggregate(last=Max('id'))['last']
+        timeline.fan_out(new_posts.filter(id__lte=last_id or 0).values(
+            'id', 'author_id', 'pub_date').iterator())
+        self.last_id = last_id or self.last_id
+        self.author_deltas.clear()
+        self.touched_groups.clear()
+
+    def report(self, final=False):
+        elapsed = time.monotonic() - self.started
+        rate = self.imported / elapsed if elapsed else 0
+        message = (
+            f'Загружено: {self.imported}, пропущено: {self.skipped}, '
+            f'{rate:.0f} строк/с'
+        )
+        if final:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stderr.write(message)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.fts import FTS_TABLE, fts_available, install_fts
+
+
+class Command(BaseCommand):
+    help = (
+        'Восстанавливает FTS5-индекс постов и его триггеры '
+        'и перестраивает индекс по posts_post.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimize', action='store_true',
+            help='Слить сегменты индекса после перестроения.',
+        )
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite.')
+        install_fts(rebuild=True)
+        if options['optimize']:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) "
+                    f"VALUES ('optimize')"
+                )
+        self.stdout.write('Поисковый индекс перестроен.')
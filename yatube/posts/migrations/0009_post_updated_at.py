@@ -0,0 +1,23 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        # Для старых постов дата изменения совпадает с датой публикации.
+        migrations.RunSQL(
+            'UPDATE posts_post SET updated_at = pub_date',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from posts.fts import install_fts, uninstall_fts
+
+
+def forwards(apps, schema_editor):
+    install_fts(schema_editor.connection)
+
+
+def backwards(apps, schema_editor):
+    uninstall_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
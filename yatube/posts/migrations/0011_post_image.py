@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+from posts.fts import install_fts
+
+
+def restore_fts_triggers(apps, schema_editor):
+    # SQLite пересоздаёт таблицу при AddField, триггеры FTS теряются.
+    install_fts(schema_editor.connection, rebuild=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,10 @@ class Post(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -26,15 +30,40 @@ class Post(models.Model):
         on_delete=models.SET_NULL,
         verbose_name='Группа',
     )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
 
     class Meta:
         ordering = ['pub_date']
+        indexes = [
+            # Ключ курсорной пагинации ленты: (pub_date, id).
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='post_pub_date_id_idx',
+            ),
+            # Лента профиля и группы: фильтр по автору/группе
+            # и сортировка по (pub_date, id) прямо из индекса.
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', 'pub_date', 'id'],
+                name='post_group_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
         return self.text[:15]
 
+    def get_absolute_url(self):
+        return reverse('post:post_detail', kwargs={'post_id': self.pk})
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -59,4 +88,119 @@ class Group(models.Model):
         return self.title
 
     def get_absolute_url(self):
-        return reverse('group', kwargs={'slug': self.slug})
+        return reverse('post:group', kwargs={'slug': self.slug})
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Автор',
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='following'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='follow_user_author_unique',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='follow_not_self',
+            ),
+        ]
+        indexes = [
+            # Рассылка нового поста: все подписчики автора.
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user_idx',
+            ),
+        ]
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Строка персональной ленты: пост автора, на которого подписан
+    ``user``. Заполняется при публикации (fan-out on write), дата и
+    автор поста продублированы, чтобы лента читалась одним индексом."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Читатель',
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='+'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор поста',
+        related_name='+'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='timeline_user_post_unique',
+            ),
+        ]
+        indexes = [
+            # Ключ курсорной пагинации ленты читателя.
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+            # Отписка: удалить посты автора из ленты читателя.
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx',
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи лент'
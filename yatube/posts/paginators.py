@@ -0,0 +1,206 @@
+import base64
+import binascii
+from functools import partial
+
+from django.core.paginator import Page
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def page_window(number, num_pages, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей плюс первые и последние.
+
+    Пропуски обозначаются ``None``. Длина результата не зависит от
+    ``num_pages``, поэтому разметка пагинатора не растёт вместе с лентой.
+    """
+    window_start = max(number - on_each_side, 1)
+    window_end = min(number + on_each_side, num_pages)
+    pages = []
+    # Многоточие ставим, только если оно скрывает хотя бы две страницы.
+    if window_start > on_ends + 2:
+        pages.extend(range(1, on_ends + 1))
+        pages.append(None)
+    else:
+        window_start = 1
+    pages.extend(range(window_start, window_end + 1))
+    if window_end < num_pages - on_ends - 1:
+        pages.append(None)
+        pages.extend(range(num_pages - on_ends + 1, num_pages + 1))
+    else:
+        pages.extend(range(window_end + 1, num_pages + 1))
+    return pages
+
+
+def encode_cursor(direction, pub_date, pk):
+    """Упаковывает позицию в ленте в непрозрачную строку для ?cursor=."""
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (direction, pub_date, pk) или None для битого курсора."""
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """Страница ленты, выбранная по ключу (pub_date, id) без OFFSET.
+
+    Запрос выполняется при первом обращении к странице, поэтому
+    страница, отданная из кеша фрагментов, базу не трогает.
+    """
+
+    is_cursor_page = True
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    @cached_property
+    def _result(self):
+        return self._loader()
+
+    @property
+    def object_list(self):
+        return self._result[0]
+
+    @property
+    def next_cursor(self):
+        return self._result[1]
+
+    @property
+    def previous_cursor(self):
+        return self._result[2]
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorLinkedPage(Page):
+    """Страница ``?page=N`` с курсорными ссылками на соседние страницы.
+
+    Так старые ссылки продолжают работать, а кнопки
+    «Следующая»/«Предыдущая» сразу ведут в курсорный режим.
+    """
+
+    @cached_property
+    def next_cursor(self):
+        if not self.has_next() or not len(self):
+            return None
+        last = self[len(self) - 1]
+        return encode_cursor(NEXT, last.pub_date, last.pk)
+
+    @cached_property
+    def previous_cursor(self):
+        if not self.has_previous() or not len(self):
+            return None
+        first = self[0]
+        return encode_cursor(PREVIOUS, first.pub_date, first.pk)
+
+
+class CursorPaginator:
+    """Keyset-пагинация по убыванию (pub_date, id).
+
+    Каждая страница — это один запрос с ``WHERE (pub_date, id) < (...)``
+    и ``LIMIT per_page + 1``, поэтому глубина страницы не влияет на
+    время ответа, а новые посты не сдвигают уже открытые страницы.
+    """
+
+    def __init__(self, object_list, per_page, fields=('pub_date', 'id'),
+                 prepare=None):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.date_field, self.pk_field = fields
+        # Превращает строки страницы в объекты для шаблона, например
+        # ключи из .values() — в посты. Курсоры считаются по строкам.
+        self.prepare = prepare
+
+    def _key(self, obj):
+        # Страницы .values() состоят из словарей, а не из моделей.
+        if isinstance(obj, dict):
+            return obj[self.date_field], obj[self.pk_field]
+        return getattr(obj, self.date_field), getattr(obj, self.pk_field)
+
+    # Условие (pub_date, id) < (X, Y) записано как
+    # pub_date <= X AND (pub_date < X OR id < Y): первая часть даёт
+    # SQLite диапазон по индексу, одно только OR индекс не использует.
+    def _after(self, pub_date, pk):
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__lte': pub_date}),
+            Q(**{f'{self.date_field}__lt': pub_date})
+            | Q(**{f'{self.pk_field}__lt': pk}),
+        ).order_by(f'-{self.date_field}', f'-{self.pk_field}')
+
+    def _before(self, pub_date, pk):
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__gte': pub_date}),
+            Q(**{f'{self.date_field}__gt': pub_date})
+            | Q(**{f'{self.pk_field}__gt': pk}),
+        ).order_by(self.date_field, self.pk_field)
+
+    def page(self, cursor=None):
+        return CursorPage(partial(self._load, cursor))
+
+    def _load(self, cursor):
+        position = decode_cursor(cursor)
+        if position is None:
+            queryset = self.object_list.order_by(
+                f'-{self.date_field}', f'-{self.pk_field}')
+            direction = None
+        elif position[0] == NEXT:
+            queryset = self._after(*position[1:])
+            direction = NEXT
+        else:
+            queryset = self._before(*position[1:])
+            direction = PREVIOUS
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if direction == PREVIOUS:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, direction == NEXT
+        if not items and direction is not None:
+            # Курсор указывает за край ленты — начинаем сначала.
+            return self._load(None)
+        next_cursor = previous_cursor = None
+        if has_next:
+            next_cursor = encode_cursor(NEXT, *self._key(items[-1]))
+        if has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, *self._key(items[0]))
+        if self.prepare is not None:
+            items = self.prepare(items)
+        return items, next_cursor, previous_cursor
@@ -0,0 +1,75 @@
+import re
+
+from django.db import connection
+
+from .fts import FTS_TABLE, fts_available
+from .models import Post
+
+
+def build_match(query):
+    """Превращает пользовательский ввод в безопасное выражение MATCH.
+
+    Каждое слово берётся в кавычки, так что операторы FTS5 во вводе
+    не работают и не ломают запрос; все слова должны встретиться.
+    """
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def filter_matching(queryset, query):
+    """Оставляет в ``queryset`` посты, подходящие под ``query``."""
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        where=[
+            f'"{table}"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[build_match(query)],
+    )
+
+
+class SearchResults:
+    """Ленивая выдача поиска, упорядоченная по bm25, для Paginator."""
+
+    def __init__(self, query):
+        self.match = build_match(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        offset = index.start or 0
+        limit = index.stop - offset
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY rank '
+                f'LIMIT %s OFFSET %s',
+                [self.match, limit, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.select_related('author', 'group').in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    """Посты по запросу: FTS5 на SQLite, иначе icontains."""
+    if fts_available():
+        return SearchResults(query)
+    return Post.objects.filter(text__icontains=query).select_related(
+        'author', 'group').order_by('-pub_date', '-id')
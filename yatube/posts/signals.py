@@ -0,0 +1,123 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from . import fragments, timeline
+from .counters import change_count, count_key
+from .models import AuthorStats, Follow, Group, Post
+
+
+def _post_count_keys(group_id):
+    keys = [count_key('all')]
+    if group_id is not None:
+        keys.append(count_key('group', group_id))
+    return keys
+
+
+def _change_author_stats(author_id, delta):
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        # Строки ещё нет: заводим её с честным подсчётом, пост уже в базе.
+        # При удалении не создаём — автор может удаляться вместе с постами.
+        _, created = AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+        if not created:
+            AuthorStats.objects.filter(author_id=author_id).update(
+                posts_count=F('posts_count') + delta)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_relations(sender, instance, **kwargs):
+    """Запоминает исходных автора и группу, чтобы при их смене
+    поправить счётчики и старого, и нового владельца."""
+    instance._counted_author_id = instance.author_id
+    instance._counted_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_count(1, *_post_count_keys(instance.group_id))
+        _change_author_stats(instance.author_id, 1)
+    else:
+        old_author = instance._counted_author_id
+        old_group = instance._counted_group_id
+        if old_author != instance.author_id:
+            _change_author_stats(old_author, -1)
+            _change_author_stats(instance.author_id, 1)
+        if old_group != instance.group_id:
+            if old_group is not None:
+                change_count(-1, count_key('group', old_group))
+            if instance.group_id is not None:
+                change_count(1, count_key('group', instance.group_id))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_count(-1, *_post_count_keys(instance._counted_group_id))
+    _change_author_stats(instance._counted_author_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    fragments.bump_posts(
+        {instance._counted_author_id, instance.author_id},
+        {instance._counted_group_id, instance.group_id},
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_fragments(sender, instance, **kwargs):
+    fragments.bump_posts(
+        {instance._counted_author_id}, {instance._counted_group_id})
+
+
+@receiver(post_save, sender=Post)
+def reset_post_relations(sender, instance, **kwargs):
+    """Последний обработчик post_save: сохранённые автор и группа
+    становятся исходными для следующего сохранения."""
+    remember_post_relations(sender, instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_fragments(sender, instance, **kwargs):
+    """Название и slug группы выводятся в ленте, профилях её авторов
+    и на странице самой группы. При удалении смотрим посты до того,
+    как у них обнулится group_id."""
+    if kwargs.get('created'):
+        return
+    author_ids = set(
+        Post.objects.filter(group=instance)
+        .order_by().values_list('author_id', flat=True).distinct()
+    )
+    fragments.bump_posts(author_ids, {instance.pk})
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out([instance])
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        timeline.followed(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.unfollowed(instance.user_id, instance.author_id)
@@ -0,0 +1,16 @@
+from django import template
+
+from posts.paginators import page_window
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_numbers(page_obj, on_each_side=2, on_ends=1):
+    """Окно номеров страниц для includes/paginator.html."""
+    return page_window(
+        page_obj.number,
+        page_obj.paginator.num_pages,
+        on_each_side,
+        on_ends,
+    )
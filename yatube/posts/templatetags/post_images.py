@@ -0,0 +1,17 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(image, alias):
+    """{% post_thumbnail post.image 'feed' as im %}
+
+    Готовая миниатюра размера из posts.thumbnails.THUMBNAILS или, пока
+    её нет, оригинал. Пустое поле даёт None.
+    """
+    if not image:
+        return None
+    return thumbnails.get(image, alias)
@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+                text=f'Пост {number}',
+            )
+            for number in range(25)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_pages_follow_cursor(self):
+        """Курсор проходит всю ленту без повторов и пропусков."""
+        url = reverse('post:api_posts')
+        seen = []
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        expected = sorted(
+            (post.pk for post in self.posts), reverse=True)
+        self.assertEqual(seen, expected)
+
+    def test_previous_link(self):
+        first = self.client.get(
+            reverse('post:api_posts'), {'limit': 10}).json()
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(first['previous'])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_group_and_profile_feeds(self):
+        cases = {
+            reverse('post:api_group_posts', args=[self.group.slug]): 12,
+            reverse('post:api_profile_posts', args=['test_user']): 20,
+        }
+        for url, count in cases.items():
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                self.assertEqual(len(data['results']), count)
+
+    def test_fields_limit_selected_columns(self):
+        """fields= попадает прямо в SELECT."""
+        url = reverse('post:api_posts')
+        with self.assertNumQueries(1) as queries:
+            data = self.client.get(url, {'fields': 'id,author'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('"text"', sql)
+        self.assertIn('"username"', sql)
+
+    def test_unknown_field_returns_400(self):
+        response = self.client.get(
+            reverse('post:api_posts'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['detail'])
+
+    def test_missing_objects_return_json_404(self):
+        urls = (
+            reverse('post:api_group_posts', args=['unknown']),
+            reverse('post:api_profile_posts', args=['unknown']),
+            reverse('post:api_post_detail', args=[10 ** 6]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(
+                    response['Content-Type'],
+                    'application/json; charset=utf-8')
+
+    def test_post_detail(self):
+        post = self.posts[1]
+        url = reverse('post:api_post_detail', args=[post.pk])
+        data = self.client.get(url).json()
+        self.assertEqual(data, {
+            'id': post.pk,
+            'text': post.text,
+            'pub_date': data['pub_date'],
+            'author': 'test_user',
+            'group': 'test-slug',
+        })
+
+    def test_no_templates_rendered(self):
+        response = self.client.get(reverse('post:api_posts'))
+        self.assertEqual(response.templates, [])
+
+    def test_list_etag_revalidation(self):
+        """Неизменившаяся лента отвечает 304 без запроса постов."""
+        url = reverse('post:api_posts')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_etag_revalidation(self):
+        post = Post.objects.get(pk=self.posts[0].pk)
+        url = reverse('post:api_post_detail', args=[post.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        post.text = 'Исправлено'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_read_only(self):
+        response = self.client.post(reverse('post:api_posts'))
+        self.assertEqual(response.status_code, 405)
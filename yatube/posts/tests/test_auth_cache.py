@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from users.backends import user_key
+from users.checks import check_shared_cache
+
+from ..models import Post, User
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='test_user', password='old-password')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='test_user', password='old-password')
+
+    def test_logged_in_index_needs_no_queries(self):
+        self.client.get(reverse('post:main'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('post:main'))
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.get(reverse('post:main'))
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(reverse('post:create'))
+        self.assertRedirects(response, '/auth/login/?next=/create/')
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(reverse('post:main'))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('post:create'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(USERS_CACHE_TIMEOUT=5)
+    def test_timeout_setting_is_read_per_call(self):
+        with mock.patch('users.backends.cache.set') as cache_set:
+            self.client.get(reverse('post:main'))
+        cache_set.assert_any_call(
+            user_key(self.user.pk), self.user, 5)
+
+    def test_logout_drops_cached_user(self):
+        self.client.get(reverse('post:main'))
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        response = self.client.get(reverse('post:create'))
+        self.assertEqual(response.status_code, 302)
+
+
+LOCMEM = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+SHARED = {'default': {
+    'BACKEND': 'core.cache.backends.sqlite.SQLiteCache',
+    'LOCATION': '/tmp/unused.sqlite3'}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM)
+    def test_per_process_cache_is_an_error(self):
+        errors = check_shared_cache(None)
+        self.assertEqual(
+            [error.id for error in errors], ['users.E001', 'users.E001'])
+
+    @override_settings(CACHES=LOCMEM, SESSION_ENGINE=(
+        'django.contrib.sessions.backends.db'), AUTHENTICATION_BACKENDS=[
+        'django.contrib.auth.backends.ModelBackend'])
+    def test_uncached_auth_does_not_need_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=SHARED)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,102 @@
+import multiprocessing
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.cache.backends.sqlite import SQLiteCache
+
+
+def increment(location, times):
+    cache = SQLiteCache(location, {})
+    for _ in range(times):
+        cache.incr('counter')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.location = f'{self.directory}/cache.sqlite3'
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.location, {'OPTIONS': options})
+
+    def test_basic_operations(self):
+        cache = self.make_cache()
+        cache.set('post', {'text': 'Пост'})
+        self.assertEqual(cache.get('post'), {'text': 'Пост'})
+        self.assertIsNone(cache.get('missing'))
+        self.assertFalse(cache.add('post', 'другой'))
+        self.assertTrue(cache.add('count', 1))
+        self.assertEqual(cache.incr('count', 5), 6)
+        self.assertEqual(cache.decr('count'), 5)
+        cache.set_many({'a': 1, 'b': 2})
+        cache.delete_many(['a'])
+        self.assertEqual(cache.get_many(['a', 'b', 'count']),
+                         {'b': 2, 'count': 5})
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.clear()
+        self.assertIsNone(cache.get('b'))
+
+    def test_shared_between_instances(self):
+        self.make_cache().set('key', 'value')
+        self.assertEqual(self.make_cache().get('key'), 'value')
+
+    def test_timeouts(self):
+        cache = self.make_cache()
+        with mock.patch('time.time', return_value=1000):
+            cache.set('short', 'value', 10)
+            cache.set('forever', 'value', None)
+        with mock.patch('time.time', return_value=1011):
+            self.assertIsNone(cache.get('short'))
+            self.assertFalse(cache.has_key('short'))
+            self.assertTrue(cache.add('short', 'new'))
+            self.assertEqual(cache.get('forever'), 'value')
+
+    def test_least_recently_used_are_evicted(self):
+        cache = self.make_cache(MAX_ENTRIES=10, TOUCH_INTERVAL=0)
+        for number in range(10):
+            cache.set(number, number)
+            time.sleep(0.001)
+        cache.get(0)
+        cache.set('new', 'value')
+        self.assertEqual(cache.get(0), 0)
+        self.assertEqual(cache.get('new'), 'value')
+        self.assertIsNone(cache.get(1))
+
+    def test_size_cap(self):
+        cache = self.make_cache(MAX_SIZE=10_000)
+        for number in range(20):
+            cache.set(number, b'x' * 1000)
+        size, = cache._connection().execute(
+            'SELECT SUM(size) FROM cache').fetchone()
+        self.assertLessEqual(size, 10_000)
+        self.assertIsNotNone(cache.get(19))
+
+    def test_incr_is_atomic_across_processes(self):
+        self.make_cache().set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=increment, args=(self.location, 200))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(self.make_cache().get('counter'), 600)
+
+    def test_bench_cache_command(self):
+        out = StringIO()
+        call_command('bench_cache', '--processes', '2', '--ops', '50',
+                     '--keys', '10', stdout=out)
+        output = out.getvalue()
+        self.assertIn('sqlite', output)
+        self.assertIn('counter 10/10', output)
+        self.assertIn('locmem', output)
@@ -0,0 +1,254 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..bench import generate_dataset
+from ..counters import feed_count
+from ..models import AuthorStats, Group, Post, User
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    def setUp(self):
+        cache.clear()
+
+    def write_file(self, suffix, content):
+        descriptor, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def import_posts(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', *args, stdout=out, stderr=err)
+        return out.getvalue()
+
+    def test_import_jsonl_file(self):
+        """JSONL загружается пачками, даты и группы сохраняются."""
+        rows = [
+            {'text': f'Пост {number}', 'author': 'test_user',
+             'group': 'test-slug', 'pub_date': '2020-01-02T03:04:05'}
+            for number in range(7)
+        ]
+        path = self.write_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        output = self.import_posts(path, '--batch-size', '3')
+        self.assertIn('Загружено: 7, пропущено: 0', output)
+        posts = Post.objects.filter(author=self.author)
+        self.assertEqual(posts.filter(group=self.group).count(), 7)
+        self.assertEqual(posts.first().pub_date.year, 2020)
+
+    def test_import_csv_from_stdin_skips_bad_rows(self):
+        """CSV из stdin: строки без автора, текста или группы пропускаются."""
+        content = (
+            'text,author,group\n'
+            'Хороший пост,test_user,\n'
+            'Чужой автор,nobody,\n'
+            ',test_user,\n'
+            'Нет группы,test_user,missing\n'
+        )
+        with mock.patch('sys.stdin', StringIO(content)):
+            output = self.import_posts('-', '--format', 'csv')
+        self.assertIn('Загружено: 1, пропущено: 3', output)
+
+    def test_import_creates_authors_and_updates_counters(self):
+        """Новые авторы создаются, счётчики постов пересчитываются."""
+        feed_count()
+        path = self.write_file('.jsonl', (
+            '{"text": "Первый", "author": "new_user"}\n'
+            'не json\n'
+            '{"text": "Второй", "author": "new_user"}\n'
+        ))
+        output = self.import_posts(path, '--create-authors')
+        self.assertIn('Загружено: 2, пропущено: 1', output)
+        new_user = User.objects.get(username='new_user')
+        self.assertEqual(
+            AuthorStats.objects.get(author=new_user).posts_count, 2)
+        self.assertEqual(feed_count(), 2)
+
+    def test_non_object_json_lines_are_skipped(self):
+        """Корректный JSON, но не объект, считается пропущенной строкой."""
+        path = self.write_file('.jsonl', (
+            '[]\n1\n"x"\nnull\n'
+            '{"text": "Пост", "author": "test_user"}\n'
+        ))
+        output = self.import_posts(path)
+        self.assertIn('Загружено: 1, пропущено: 4', output)
+
+    def test_impossible_dates_are_skipped(self):
+        """Несуществующая дата пропускает строку, а не весь импорт."""
+        path = self.write_file('.jsonl', '\n'.join(json.dumps(row) for row in (
+            {'text': 'Нет дня', 'author': 'test_user',
+             'pub_date': '2020-02-30T10:00:00'},
+            {'text': 'Нет часа', 'author': 'test_user',
+             'pub_date': '2020-02-28T25:00:00'},
+            {'text': 'Пост', 'author': 'test_user',
+             'pub_date': '2020-02-28T10:00:00'},
+        )))
+        output = self.import_posts(path)
+        self.assertIn('Загружено: 1, пропущено: 2', output)
+
+    def test_non_string_fields_are_skipped(self):
+        """Список или число вместо строки — пропущенная строка."""
+        path = self.write_file('.jsonl', '\n'.join(json.dumps(row) for row in (
+            {'text': 'Автор списком', 'author': ['test_user']},
+            {'text': 'Группа объектом', 'author': 'test_user',
+             'group': {'slug': 'test-slug'}},
+            {'text': 1, 'author': 'test_user'},
+            {'text': 'Дата числом', 'author': 'test_user', 'pub_date': 1},
+            {'text': 'Пост', 'author': 'test_user', 'group': 'test-slug'},
+        )))
+        output = self.import_posts(path)
+        self.assertIn('Загружено: 1, пропущено: 4', output)
+
+    def test_interrupted_import_keeps_counters_in_sync(self):
+        """Оборвавшийся импорт оставляет счётчики загруженных пачек."""
+        feed_count()
+
+        def rows(stream, fmt):
+            for number in range(4):
+                yield {'text': f'Пост {number}', 'author': 'test_user'}
+            raise UnicodeDecodeError('utf-8', b'', 0, 1, 'битый файл')
+
+        path = self.write_file('.jsonl', '')
+        with mock.patch(
+                'posts.management.commands.import_posts.read_rows', rows):
+            with self.assertRaises(UnicodeDecodeError):
+                self.import_posts(path, '--batch-size', '2')
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 4)
+        self.assertEqual(feed_count(), 4)
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.other = User.objects.create_user(username='other_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        Post.objects.create(author=cls.author, group=cls.group, text='Один')
+        Post.objects.create(author=cls.author, text='Два, с запятой')
+        Post.objects.create(author=cls.other, group=cls.group, text='Три')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_profile_export_streams_csv(self):
+        """Выгрузка профиля отдаётся потоком в CSV."""
+        response = self.client.get(reverse(
+            'post:profile_export', kwargs={'username': 'test_user'}))
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(
+            [row['text'] for row in rows], ['Один', 'Два, с запятой'])
+        self.assertEqual(rows[0]['group'], 'test-slug')
+
+    def test_group_export_streams_jsonl(self):
+        """Выгрузка группы отдаётся потоком в JSONL."""
+        response = self.client.get(
+            reverse('post:group_export', kwargs={'slug': 'test-slug'}),
+            {'format': 'jsonl'},
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['author'] for row in rows], ['test_user', 'other_user'])
+
+    def test_unknown_export_format_is_404(self):
+        """Неизвестный формат выгрузки даёт 404."""
+        response = self.client.get(
+            reverse('post:group_export', kwargs={'slug': 'test-slug'}),
+            {'format': 'xml'},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_command_round_trips_through_import(self):
+        """Выгрузку export_posts можно загрузить обратно import_posts."""
+        out = StringIO()
+        call_command('export_posts', '--author', 'test_user', stdout=out)
+        Post.objects.filter(author=self.author).delete()
+        with mock.patch('sys.stdin', StringIO(out.getvalue())):
+            call_command('import_posts', '-', stdout=StringIO(),
+                         stderr=StringIO())
+        self.assertEqual(
+            set(self.author.posts.values_list('text', flat=True)),
+            {'Один', 'Два, с запятой'})
+
+
+class BenchViewsCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        descriptor, self.report_path = tempfile.mkstemp(suffix='.json')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.report_path)
+
+    def bench(self, *args):
+        out = StringIO()
+        call_command(
+            'bench_views', '--posts', '50', '--users', '5', '--groups', '2',
+            '--repeat', '2', '--warmup', '0', '--output', self.report_path,
+            *args, stdout=out, stderr=StringIO(),
+        )
+        with open(self.report_path, encoding='utf-8') as stream:
+            return json.load(stream), out.getvalue()
+
+    def test_dataset_is_deterministic(self):
+        first = generate_dataset(users=3, groups=2, posts=20, seed=1)
+        texts = list(Post.objects.order_by('id').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date'))
+        Post.objects.all().delete()
+        for user in first[0]:
+            user.delete()
+        for group in first[1]:
+            group.delete()
+        generate_dataset(users=3, groups=2, posts=20, seed=1)
+        self.assertEqual(texts, list(Post.objects.order_by('id').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date')))
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            20)
+
+    def test_report_covers_every_view(self):
+        """Отчёт содержит все маршруты для гостя и пользователя,
+        данные прогона откатываются."""
+        report, _ = self.bench()
+        names = {row['name'] for row in report['views']}
+        for name in ('post:main', 'post:api_posts', 'users:login',
+                     'about:tech'):
+            self.assertIn(name, names)
+        self.assertEqual(len(report['views']), 2 * len(names))
+        for row in report['views']:
+            self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+            self.assertIn(row['status'], (200, 302))
+        self.assertFalse(Post.objects.exists())
+
+    def test_compare_flags_regressions(self):
+        report, _ = self.bench('--only', 'post:main')
+        for row in report['views']:
+            row['queries'] = 0
+            row['bytes'] = 1
+        with open(self.report_path, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream)
+        baseline = self.report_path + '.baseline'
+        os.rename(self.report_path, baseline)
+        self.addCleanup(os.remove, baseline)
+        with self.assertRaises(CommandError):
+            self.bench('--only', 'post:main', '--compare', baseline)
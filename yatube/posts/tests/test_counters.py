@@ -0,0 +1,132 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..counters import author_count, count_key, feed_count, group_count
+from ..models import AuthorStats, Group, Post, User
+
+
+class CachedCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.other_author = User.objects.create_user(username='other_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_counts(self, feed, author, other_author, group, other_group):
+        authors = User.objects.select_related('stats').in_bulk(
+            [self.author.pk, self.other_author.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(feed_count(), feed)
+            self.assertEqual(author_count(authors[self.author.pk]), author)
+            self.assertEqual(
+                author_count(authors[self.other_author.pk]), other_author)
+            self.assertEqual(group_count(self.group.pk), group)
+            self.assertEqual(group_count(self.other_group.pk), other_group)
+
+    def warm_up(self):
+        feed_count()
+        group_count(self.group.pk)
+        group_count(self.other_group.pk)
+
+    def test_counts_follow_create_and_delete(self):
+        """Создание и удаление поста сдвигают счётчики без COUNT(*)."""
+        self.warm_up()
+        post = Post.objects.create(
+            author=self.other_author, group=self.group, text='Ещё пост')
+        self.assert_counts(2, 1, 1, 2, 0)
+        post.delete()
+        self.assert_counts(1, 1, 0, 1, 0)
+
+    def test_counts_follow_author_and_group_change(self):
+        """Смена автора или группы переносит пост между счётчиками."""
+        self.warm_up()
+        post = Post.objects.get(pk=self.post.pk)
+        post.author = self.other_author
+        post.group = self.other_group
+        post.save()
+        self.assert_counts(1, 0, 1, 0, 1)
+        post.group = None
+        post.save()
+        self.assert_counts(1, 0, 1, 0, 0)
+
+    @override_settings(POSTS_APPROXIMATE_FEED_COUNT=True)
+    def test_approximate_feed_count_uses_id_range(self):
+        """Приблизительный режим оценивает ленту по диапазону id."""
+        extra = Post.objects.create(author=self.author, text='Пост')
+        last = Post.objects.create(author=self.author, text='Пост')
+        extra.delete()
+        cache.clear()
+        self.assertEqual(feed_count(), last.pk - self.post.pk + 1)
+
+    def test_count_stale_after_race_expires_quickly(self):
+        """Число, разминувшееся с сигналом, живёт не дольше минуты."""
+        old_count = Post.objects.count()
+
+        def stale_count():
+            Post.objects.create(author=self.author, text='Гонка')
+            return old_count
+
+        with mock.patch.object(Post.objects, 'count', stale_count):
+            self.assertEqual(feed_count(), old_count)
+        self.assertEqual(cache.get(count_key('all')), old_count)
+        later = time.time() + 61
+        with mock.patch('time.time', return_value=later):
+            self.assertEqual(feed_count(), old_count + 1)
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.other_author = User.objects.create_user(username='other_user')
+
+    def stored_count(self, author):
+        return AuthorStats.objects.get(author=author).posts_count
+
+    def test_counter_follows_create_delete_and_author_change(self):
+        """Счётчик автора обновляется при создании, удалении и смене автора."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertEqual(self.stored_count(self.author), 2)
+        post.author = self.other_author
+        post.save()
+        self.assertEqual(self.stored_count(self.author), 1)
+        self.assertEqual(self.stored_count(self.other_author), 1)
+        post.delete()
+        self.assertEqual(self.stored_count(self.other_author), 0)
+
+    def test_deleting_author_with_posts(self):
+        """Удаление автора вместе с постами не ломает счётчики."""
+        Post.objects.create(author=self.author, text='Пост')
+        self.author.delete()
+        self.assertFalse(AuthorStats.objects.filter(
+            author_id=self.author.pk).exists())
+
+    def test_backfill_command_recounts_posts(self):
+        """backfill_post_counts учитывает посты, созданные без сигналов."""
+        Post.objects.bulk_create([
+            Post(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ])
+        AuthorStats.objects.create(
+            author=self.other_author, posts_count=7, followers_count=2)
+        call_command('backfill_post_counts', stdout=StringIO())
+        self.assertEqual(self.stored_count(self.author), 3)
+        # У автора без постов остаётся строка с нулём, остальные
+        # счётчики не трогаются.
+        stats = AuthorStats.objects.get(author=self.other_author)
+        self.assertEqual(stats.posts_count, 0)
+        self.assertEqual(stats.followers_count, 2)
@@ -0,0 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class SqliteBackendTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma('foreign_keys'), 1)
+
+    def test_bench_sqlite_compares_modes(self):
+        out = StringIO()
+        call_command(
+            'bench_sqlite', '--duration', '0.2', '--readers', '1',
+            '--writers', '1', '--posts', '50', stdout=out,
+        )
+        output = out.getvalue()
+        for line in ('default', 'tuned', 'read: ×', 'write: ×'):
+            self.assertIn(line, output)
@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.other_author = User.objects.create_user(username='other_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост в группе')
+        cls.other_post = Post.objects.create(
+            author=cls.other_author, text='Пост без группы')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_contain_their_posts(self):
+        cases = {
+            reverse('post:feed_rss'): (True, True),
+            reverse('post:feed_atom'): (True, True),
+            reverse('post:group_rss', args=[self.group.slug]): (True, False),
+            reverse('post:group_atom', args=[self.group.slug]): (True, False),
+            reverse('post:profile_rss', args=['other_user']): (False, True),
+            reverse('post:profile_atom', args=['other_user']): (False, True),
+        }
+        for url, (has_post, has_other) in cases.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                content = response.content.decode()
+                self.assertEqual(self.post.text in content, has_post)
+                self.assertEqual(self.other_post.text in content, has_other)
+                if has_post:
+                    self.assertIn(self.post.get_absolute_url(), content)
+
+    def test_atom_content_type(self):
+        response = self.client.get(reverse('post:feed_atom'))
+        self.assertTrue(
+            response['Content-Type'].startswith('application/atom+xml'))
+
+    def test_unknown_group_or_author_returns_404(self):
+        for url in (reverse('post:group_rss', args=['unknown']),
+                    reverse('post:profile_atom', args=['unknown'])):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_feed_is_cached_until_new_post(self):
+        """XML собирается один раз и сбрасывается новым постом."""
+        url = reverse('post:group_rss', args=[self.group.slug])
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        Post.objects.create(
+            author=self.other_author, text='Пост вне группы')
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        Post.objects.create(
+            author=self.other_author, group=self.group, text='Новый пост')
+        self.assertContains(self.client.get(url), 'Новый пост')
+
+    def test_conditional_get_returns_304(self):
+        url = reverse('post:profile_rss', args=['test_user'])
+        response = self.client.get(url)
+        last_modified = response['Last-Modified']
+        cached = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(cached.status_code, 304)
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        fresh = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_cached_feed_is_per_host(self):
+        """Ссылки в XML ведут на тот хост и схему, с которых пришёл
+        запрос."""
+        url = reverse('post:feed_rss')
+        self.client.get(url, HTTP_HOST='one.example')
+        for host, secure in (('two.example', False), ('one.example', True)):
+            with self.subTest(host=host, secure=secure):
+                response = self.client.get(
+                    url, HTTP_HOST=host, secure=secure)
+                scheme = 'https' if secure else 'http'
+                self.assertIn(
+                    f'{scheme}://{host}{self.post.get_absolute_url()}',
+                    response.content.decode())
@@ -0,0 +1,134 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def follow(self, user, author):
+        self.client.force_login(user)
+        self.client.post(reverse(
+            'post:profile_follow', kwargs={'username': author.username}))
+
+    def feed(self, user=None, cursor=None):
+        self.client.force_login(user or self.reader)
+        params = {'cursor': cursor} if cursor else {}
+        return self.client.get(reverse('post:follow_index'), params)
+
+    def feed_posts(self, user=None):
+        return list(self.feed(user).context['page_obj'])
+
+    def test_follow_and_unfollow(self):
+        self.follow(self.reader, self.author)
+        self.follow(self.reader, self.author)
+        self.assertEqual(Follow.objects.filter(
+            user=self.reader, author=self.author).count(), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 1)
+        response = self.client.get(reverse(
+            'post:profile', kwargs={'username': self.author.username}))
+        self.assertTrue(response.context['following'])
+        self.client.post(reverse(
+            'post:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 0)
+
+    def test_follow_requires_post_with_csrf_token(self):
+        """Подписка меняет состояние только POST-запросом формы."""
+        for name in ('post:profile_follow', 'post:profile_unfollow'):
+            with self.subTest(name=name):
+                url = reverse(name, kwargs={'username': 'author'})
+                self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertFalse(Follow.objects.exists())
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.reader)
+        url = reverse('post:profile_follow', kwargs={'username': 'author'})
+        self.assertEqual(client.post(url).status_code, 403)
+        self.assertFalse(Follow.objects.exists())
+        response = self.client.get(reverse(
+            'post:profile', kwargs={'username': 'author'}))
+        self.assertContains(response, f'action="{url}"')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_cannot_follow_self(self):
+        self.follow(self.reader, self.reader)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_reaches_followers_only(self):
+        self.follow(self.reader, self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.feed_posts(), [post])
+        self.assertEqual(self.feed_posts(self.stranger), [])
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.follow(self.reader, self.author)
+        self.assertEqual(self.feed_posts(), [post])
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed_posts(), [])
+
+    def test_feed_is_paginated_by_cursor(self):
+        self.follow(self.reader, self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(15)
+        ]
+        first = self.feed().context['page_obj']
+        self.assertEqual(list(first), posts[:4:-1])
+        second = self.feed(cursor=first.next_cursor).context['page_obj']
+        self.assertEqual(list(second), posts[4::-1])
+        self.assertFalse(second.has_next())
+
+    def test_anonymous_is_redirected(self):
+        self.client.logout()
+        response = self.client.get(reverse('post:follow_index'))
+        self.assertRedirects(response, '/auth/login/?next=/follow/')
+
+    @mock.patch('posts.timeline.FANOUT_LIMIT', 1)
+    def test_popular_author_is_merged_on_read(self):
+        regular = User.objects.create_user(username='regular')
+        self.follow(self.reader, regular)
+        self.follow(self.reader, self.author)
+        self.follow(self.stranger, self.author)
+        posts = []
+        for number in range(6):
+            author = self.author if number % 2 else regular
+            posts.append(
+                Post.objects.create(author=author, text=f'Пост {number}'))
+        # Посты «звезды» в таблицу не раскладываются.
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.author).exists())
+        self.assertEqual(self.feed_posts(), posts[::-1])
+        self.assertEqual(self.feed_posts(self.stranger), posts[5::-2])
+        # Подписчиков снова не больше лимита: ленты дополняются.
+        Follow.objects.filter(user=self.stranger).delete()
+        self.assertEqual(TimelineEntry.objects.filter(
+            user=self.reader, author=self.author).count(), 3)
+        self.assertEqual(self.feed_posts(), posts[::-1])
+
+    def test_imported_posts_are_fanned_out(self):
+        self.follow(self.reader, self.author)
+        content = '\n'.join(
+            json.dumps({'text': f'Импорт {number}', 'author': 'author'})
+            for number in range(3))
+        with mock.patch('sys.stdin', StringIO(content)):
+            call_command('import_posts', '-', stdout=StringIO())
+        self.assertEqual(len(self.feed_posts()), 3)
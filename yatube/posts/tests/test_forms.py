@@ -2,6 +2,9 @@ import shutil
 import tempfile
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
@@ -9,6 +12,14 @@ from posts.forms import PostForm
 from posts.models import Post, Group, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
@@ -38,6 +49,9 @@ class PostFormTest(TestCase):
         super().tearDownClass()
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
+    def setUp(self):
+        cache.clear()
+
     def test_form_create(self):
         """Валидная форма создает пост."""
         post_count = Post.objects.count()
@@ -125,3 +139,41 @@ class PostFormTest(TestCase):
         )
         self.assertRedirects(response, ('/auth/login/?next=/posts/1/edit/'))
         self.assertEqual(Post.objects.count(), posts_count)
+
+    def test_form_create_with_image(self):
+        """Пост с картинкой сохраняется вместе с файлом."""
+        uploaded = SimpleUploadedFile(
+            name='small.gif', content=SMALL_GIF, content_type='image/gif')
+        self.authorized_client.post(
+            reverse('post:create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertEqual(post.image.name, 'posts/small.gif')
+
+    @override_settings(POSTS_IMAGE_MAX_SIZE=10)
+    def test_oversized_image_is_rejected(self):
+        """Картинка больше POSTS_IMAGE_MAX_SIZE не сохраняется."""
+        posts_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(
+            name='big.gif', content=SMALL_GIF, content_type='image/gif')
+        response = self.authorized_client.post(
+            reverse('post:create'),
+            data={'text': 'Слишком большая картинка', 'image': uploaded},
+        )
+        self.assertFormError(
+            response, 'form', 'image',
+            f'Картинка больше {filesizeformat(10)}.')
+        self.assertEqual(Post.objects.count(), posts_count)
+
+    def test_form_labels_and_help_texts(self):
+        """Подписи и подсказки полей берутся из PostForm.Meta."""
+        form = PostForm()
+        for field, label, help_text in (
+            ('text', 'Содержание', 'Текст поста'),
+            ('group', 'Группа', 'Группа, к которой будет относиться пост'),
+            ('image', 'Картинка', 'Картинка к посту'),
+        ):
+            with self.subTest(field=field):
+                self.assertEqual(form.fields[field].label, label)
+                self.assertEqual(form.fields[field].help_text, help_text)
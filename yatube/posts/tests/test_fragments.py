@@ -0,0 +1,121 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..fragments import fragment_stats
+from ..models import Group, Post, User
+
+
+@override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.other_author = User.objects.create_user(username='other_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+        cls.index_url = reverse('post:main')
+        cls.profile_url = reverse(
+            'post:profile', kwargs={'username': cls.author.username})
+        cls.group_url = reverse(
+            'post:group', kwargs={'slug': cls.group.slug})
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_cached(self, url, cached):
+        """Проверяет, взята ли разметка страницы из кеша фрагментов."""
+        before = fragment_stats()
+        self.client.get(url)
+        after = fragment_stats()
+        self.assertEqual(after['hits'] - before['hits'], int(cached))
+        self.assertEqual(after['misses'] - before['misses'], int(not cached))
+
+    def warm_up(self):
+        for url in (self.index_url, self.profile_url, self.group_url):
+            self.client.get(url)
+
+    def test_repeated_page_is_served_from_cache(self):
+        """Повторный запрос главной не обращается к базе."""
+        self.assert_cached(self.index_url, False)
+        hits = fragment_stats()['hits']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.index_url)
+        self.assertContains(response, self.post.text)
+        self.assertEqual(fragment_stats()['hits'] - hits, 1)
+
+    def test_broken_cursors_share_one_fragment(self):
+        """Разные битые курсоры не плодят копии первой страницы."""
+        self.assert_cached(self.index_url + '?cursor=@@@', False)
+        for cursor in ('junk', 'bm90IGEgY3Vyc29y', ''):
+            with self.subTest(cursor=cursor):
+                self.assert_cached(
+                    self.index_url + f'?cursor={cursor}', True)
+
+    def test_new_post_invalidates_only_its_scopes(self):
+        """Пост другого автора в другой группе не сбрасывает чужие
+        страницы."""
+        self.warm_up()
+        Post.objects.create(
+            author=self.other_author, group=self.other_group,
+            text='Новый пост')
+        self.assert_cached(self.index_url, False)
+        self.assert_cached(self.profile_url, True)
+        self.assert_cached(self.group_url, True)
+        response = self.client.get(self.index_url)
+        self.assertContains(response, 'Новый пост')
+
+    def test_post_edit_invalidates_pages(self):
+        """Изменённый текст сразу виден в ленте, профиле и группе."""
+        self.warm_up()
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        for url in (self.index_url, self.profile_url, self.group_url):
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.client.get(url), 'Исправленный текст')
+
+    def test_moved_post_invalidates_old_group(self):
+        """Пост, перенесённый в другую группу, пропадает из старой."""
+        self.warm_up()
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assert_cached(self.group_url, False)
+        response = self.client.get(self.group_url)
+        self.assertNotContains(response, self.post.text)
+
+    def test_group_change_invalidates_pages(self):
+        """Новый slug группы попадает в ссылки ленты и профиля."""
+        self.warm_up()
+        self.group.slug = 'new-slug'
+        self.group.save()
+        self.assert_cached(self.index_url, False)
+        self.assert_cached(self.profile_url, False)
+        response = self.client.get(self.index_url)
+        self.assertContains(response, '/group/new-slug/')
+
+
+class CachedFragmentTagTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def render(self, key, value):
+        template = Template(
+            '{% load fragments %}'
+            '{% cached_fragment key %}{{ value }}{% endcached_fragment %}'
+        )
+        return template.render(Context({'key': key, 'value': value}))
+
+    def test_fragment_is_cached_by_key(self):
+        self.assertEqual(self.render('test:key', 'первый'), 'первый')
+        self.assertEqual(self.render('test:key', 'второй'), 'первый')
+
+    def test_empty_key_disables_cache(self):
+        self.assertEqual(self.render('', 'первый'), 'первый')
+        self.assertEqual(self.render('', 'второй'), 'второй')
@@ -0,0 +1,105 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import registry
+
+from ..models import Post, User
+
+TOKEN = 'test-metrics-token'
+
+
+def sample(text, name, **labels):
+    """Значение одной строки метрики из ответа /metrics."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(
+        rf'^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$',
+        text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+@override_settings(DEBUG=False, METRICS_TOKEN=TOKEN)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def metrics(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_view_metrics_are_recorded(self):
+        """Время, запросы к базе, шаблоны и размер ответа по маршруту."""
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('post:main'))
+        text = self.metrics()
+        view = 'post:main'
+        self.assertEqual(sample(
+            text, 'yatube_request_duration_seconds_count', view=view), 1)
+        self.assertEqual(sample(
+            text, 'yatube_request_duration_seconds_bucket',
+            view=view, le='+Inf'), 1)
+        self.assertGreater(sample(
+            text, 'yatube_request_db_queries_sum', view=view), 0)
+        self.assertGreater(sample(
+            text, 'yatube_db_query_seconds_total', view=view), 0)
+        self.assertGreater(sample(
+            text, 'yatube_template_render_seconds_total', view=view), 0)
+        self.assertEqual(
+            sample(text, 'yatube_response_size_bytes_sum', view=view),
+            len(response.content))
+        self.assertEqual(sample(
+            text, 'yatube_responses_total', view=view, status=200), 1)
+
+    def test_cached_and_unknown_pages(self):
+        """Ответ из кеша учитывается без SQL, 404 — одной меткой."""
+        url = reverse('post:main')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get('/no/such/page/')
+        self.client.get('/another/missing/page/')
+        text = self.metrics()
+        self.assertEqual(sample(
+            text, 'yatube_request_db_queries_bucket',
+            view='post:main', le='0'), 1)
+        self.assertEqual(sample(
+            text, 'yatube_responses_total', view='unresolved', status=404),
+            2)
+
+    @override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+    def test_fragment_cache_counters(self):
+        """Попадания и промахи кеша фрагментов считаются в процессе."""
+        url = reverse('post:main')
+        self.client.get(url)
+        self.client.get(url)
+        text = self.metrics()
+        self.assertEqual(sample(
+            text, 'yatube_fragment_cache_total', result='miss'), 1)
+        self.assertEqual(sample(
+            text, 'yatube_fragment_cache_total', result='hit'), 1)
+
+    def test_metrics_are_not_public(self):
+        """Без токена и входа сотрудника — 403, в том числе с 127.0.0.1
+        (так выглядят все запросы за локальным прокси)."""
+        url = reverse('metrics')
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer None').status_code, 403)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
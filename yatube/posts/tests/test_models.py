@@ -32,6 +32,7 @@ class PostModelTest(TestCase):
         field_verboses = {
             'text': 'Текст публикации',
             'pub_date': 'Дата публикации',
+            'updated_at': 'Дата изменения',
             'author': 'Автор',
             'group': 'Группа',
 
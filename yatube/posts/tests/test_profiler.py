@@ -0,0 +1,87 @@
+import os
+import pstats
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+
+PROFILER_DIR = tempfile.mkdtemp()
+
+
+@override_settings(PROFILER_ENABLED=True, PROFILER_DIR=PROFILER_DIR,
+                   PROFILER_KEEP=2)
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='staff', is_staff=True)
+        cls.author = User.objects.create_user(username='test_user')
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+        self.client.force_login(self.staff)
+
+    def test_staff_request_is_profiled(self):
+        response = self.client.get(reverse('post:main'), {'_profile': 1})
+        name = response['X-Profile-Id']
+        stats = pstats.Stats(os.path.join(PROFILER_DIR, f'{name}.prof'))
+        self.assertTrue(any(
+            func[2] == 'index' for func in stats.stats))
+        index = self.client.get(reverse('profiler_index'))
+        self.assertContains(index, '/?_profile=1')
+        self.assertEqual(index.context['profiles'][0]['view'], 'post:main')
+        self.assertTrue(index.context['profiles'][0]['top'])
+        detail = self.client.get(reverse('profiler_detail', args=[name]))
+        self.assertContains(detail, 'cumtime')
+        download = self.client.get(
+            reverse('profiler_download', args=[name]))
+        self.assertEqual(download.status_code, 200)
+
+    def test_header_triggers_profile(self):
+        response = self.client.get(reverse('post:main'), HTTP_X_PROFILE='1')
+        self.assertIn('X-Profile-Id', response)
+
+    def test_regular_users_are_not_profiled(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('post:main'), {'_profile': 1})
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get(reverse('profiler_index'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_old_profiles_are_pruned(self):
+        for _ in range(3):
+            self.client.get(reverse('about:tech'), {'_profile': 1})
+        self.assertEqual(len(os.listdir(PROFILER_DIR)), 4)
+
+    def test_unknown_profile_is_404(self):
+        for name in ('missing', '..'):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse('profiler_detail', args=[name]))
+                self.assertEqual(response.status_code, 404)
+
+    def test_profile_without_metadata_is_404(self):
+        response = self.client.get(reverse('post:main'), {'_profile': 1})
+        name = response['X-Profile-Id']
+        os.remove(os.path.join(PROFILER_DIR, f'{name}.json'))
+        response = self.client.get(reverse('profiler_detail', args=[name]))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PROFILER_ENABLED=False)
+    def test_disabled_profiler(self):
+        response = self.client.get(reverse('post:main'), {'_profile': 1})
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get(reverse('profiler_index'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..views import AMOUNT_POST
+
+
+@override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+class QueryBudgetTests(TestCase):
+    """Число запросов страниц не зависит от количества постов на них.
+
+    Счётчики постов берутся из кеша, поэтому перед замером страница
+    открывается один раз, чтобы их прогреть. Кеш фрагментов
+    отключён: замеряется именно отрисовка страницы.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовый текст',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('posts.views.fragment_key', return_value='')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add_posts(self):
+        """Добавляет полную страницу постов разных авторов и групп."""
+        for number in range(AMOUNT_POST):
+            author = User.objects.create_user(username=f'author_{number}')
+            group = Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}')
+            Post.objects.create(author=author, group=group, text='Текст')
+            Post.objects.create(
+                author=self.author, group=self.group, text='Текст')
+
+    def assert_budget(self, url, budget):
+        self.client.get(url)
+        with self.assertNumQueries(budget):
+            self.client.get(url)
+        self.add_posts()
+        with self.assertNumQueries(budget):
+            self.client.get(url)
+
+    def test_index_query_budget(self):
+        """Главная: страница постов с авторами и группами."""
+        self.assert_budget(reverse('post:main'), 1)
+
+    def test_index_cursor_query_budget(self):
+        """Главная в курсорном режиме: один запрос на страницу."""
+        self.assert_budget(reverse('post:main') + '?cursor=', 1)
+
+    def test_group_query_budget(self):
+        """Группа: группа + страница постов."""
+        self.assert_budget(
+            reverse('post:group', kwargs={'slug': self.group.slug}), 2)
+
+    def test_profile_query_budget(self):
+        """Профиль: автор + страница постов."""
+        self.assert_budget(
+            reverse('post:profile', kwargs={'username': 'test_user'}), 2)
+
+    def test_post_detail_query_budget(self):
+        """Пост: пост вместе с автором и группой."""
+        self.assert_budget(
+            reverse('post:post_detail', kwargs={'post_id': self.post.pk}), 1)
@@ -0,0 +1,79 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?posts_post( AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+@override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+class QueryPlanTests(TestCase):
+    """Запросы страниц к posts_post идут по индексам, без полного
+    просмотра таблицы и без сортировки во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовый текст',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.author, group=cls.group, text=f'Пост {number}')
+            for number in range(15)
+        ])
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        cache.clear()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans_use_indexes(self, url):
+        # Без кеша: счётчики и фрагменты иначе скрыли бы часть запросов.
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        post_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'posts_post' in query['sql']
+            and query['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(post_queries, url)
+        for sql in post_queries:
+            plan = self.explain(sql)
+            with self.subTest(url=url, sql=sql):
+                for step in plan:
+                    self.assertIsNone(FULL_SCAN.match(step), plan)
+                    self.assertNotIn(TEMP_SORT, step, plan)
+
+    def test_feed_pages_use_indexes(self):
+        """Лента, группа, профиль и пост не сканируют таблицу целиком."""
+        second = reverse('post:main') + '?page=2'
+        response = self.client.get(second)
+        cursor = response.context['page_obj'].previous_cursor
+        urls = [
+            reverse('post:main'),
+            second,
+            reverse('post:main') + f'?cursor={cursor}',
+            reverse('post:group', kwargs={'slug': self.group.slug}),
+            reverse('post:group', kwargs={'slug': self.group.slug})
+            + '?page=2',
+            reverse('post:profile', kwargs={'username': 'test_user'}),
+            reverse('post:profile', kwargs={'username': 'test_user'})
+            + '?page=2',
+            reverse('post:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+        for url in urls:
+            self.assert_plans_use_indexes(url)
@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.db import routers
+
+from ..models import Post, User
+
+
+@override_settings(REPLICA_DATABASE='replica',
+                   ANONYMOUS_CACHE_URL_NAMES=[])
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        # Данные есть только в основной базе: реплика «отстала».
+        cls.author = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def detail(self, post_id):
+        return self.client.get(
+            reverse('post:post_detail', kwargs={'post_id': post_id}))
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.detail(self.post.pk).status_code, 404)
+        Post.objects.using('replica').bulk_create([
+            Post(pk=self.post.pk, author_id=self.author.pk, text='Копия')])
+        User.objects.using('replica').bulk_create([
+            User(pk=self.author.pk, username='test_user')])
+        self.assertContains(self.detail(self.post.pk), 'Копия')
+
+    def test_write_pins_reads_to_primary(self):
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse('post:create'), {'text': 'Новый пост'})
+        self.assertIn('pin_primary', response.cookies)
+        self.assertEqual(response.cookies['pin_primary']['max-age'], 10)
+        post = Post.objects.get(text='Новый пост')
+        self.assertContains(self.detail(post.pk), 'Новый пост')
+        # Окно истекло: чтение снова с реплики, где поста ещё нет.
+        del self.client.cookies['pin_primary']
+        self.assertEqual(self.detail(post.pk).status_code, 404)
+
+    def test_follow_pins_reads_to_primary(self):
+        """Подписка — запись: следующий профиль читается из основной
+        базы."""
+        reader = User.objects.create_user(username='reader')
+        self.client.force_login(reader)
+        response = self.client.post(reverse(
+            'post:profile_follow', kwargs={'username': 'test_user'}))
+        self.assertIn('pin_primary', response.cookies)
+
+    def test_get_without_writes_does_not_pin(self):
+        response = self.detail(self.post.pk)
+        self.assertNotIn('pin_primary', response.cookies)
+
+    def test_router_outside_requests_and_transactions(self):
+        router = routers.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        with routers.request_scope(replica=True):
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Post), 'default')
+            self.assertEqual(router.db_for_write(Post), 'default')
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+
+class SyncReplicaCommandTest(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_copies_primary(self):
+        author = User.objects.create_user(username='test_user')
+        Post.objects.create(author=author, text='Пост')
+        call_command('sync_replica', stdout=StringIO())
+        self.assertTrue(
+            Post.objects.using('replica').filter(text='Пост').exists())
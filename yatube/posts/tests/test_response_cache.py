@@ -0,0 +1,125 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.middleware import AnonymousCacheMiddleware
+
+from ..models import Group, Post, User
+
+
+class AnonymousCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_page_is_served_from_cache(self):
+        """Повторная главная для гостя не доходит до базы."""
+        url = reverse('post:main')
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertIn('Cookie', second['Vary'])
+        self.assertIn('public', second['Cache-Control'])
+        self.assertIn('max-age=', second['Cache-Control'])
+
+    def test_unknown_query_params_share_one_entry(self):
+        """Параметры, которые view не читает, не плодят записи кеша."""
+        url = reverse('post:main')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        for params in ({'x': 1}, {'x': 2, 'utm_source': 'mail'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response['X-Cache'], 'HIT')
+        response = self.client.get(url, {'page': 2, 'x': 1})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_authorized_user_is_not_cached(self):
+        """Залогиненный пользователь всегда получает свежую страницу."""
+        self.client.force_login(self.author)
+        url = reverse('post:main')
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('page_obj', response.context)
+
+    def test_pages_outside_whitelist_are_not_cached(self):
+        response = self.client.get(reverse('post:search'), {'q': 'пост'})
+        self.assertNotIn('X-Cache', response)
+
+    def test_new_post_invalidates_cached_pages(self):
+        """Версия ленты входит в ключ: новый пост виден сразу."""
+        url = reverse('post:profile', kwargs={'username': 'test_user'})
+        self.client.get(url)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Свежий пост')
+
+    def test_cached_etag_answers_304(self):
+        url = reverse('post:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+
+class StampedeProtectionTests(TestCase):
+    """Истёкшую запись пересобирает только один запрос."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.middleware = AnonymousCacheMiddleware(self.view)
+        self.request = RequestFactory().get(reverse('post:main'))
+
+    def view(self, request):
+        self.calls += 1
+        return HttpResponse(f'ответ {self.calls}')
+
+    def expire(self):
+        key = self.middleware.cache_key(self.request)
+        response, expires, delta = cache.get(key)
+        cache.set(key, (response, time.time() - 1, delta))
+        return key
+
+    def test_fresh_entry_is_not_rebuilt(self):
+        self.middleware(self.request)
+        for _ in range(5):
+            self.middleware(self.request)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_entry_is_served_while_rebuilding(self):
+        self.middleware(self.request)
+        key = self.expire()
+        cache.add(f'{key}:lock', 1)
+        response = self.middleware(self.request)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(response.content.decode(), 'ответ 1')
+
+    def test_expired_entry_is_rebuilt_once(self):
+        self.middleware(self.request)
+        self.expire()
+        self.assertEqual(self.middleware(self.request)['X-Cache'], 'MISS')
+        self.middleware(self.request)
+        self.assertEqual(self.calls, 2)
+
+    def test_early_refresh_near_expiry(self):
+        """Чем ближе срок и дольше пересборка, тем раньше обновление."""
+        now = time.time()
+        with mock.patch('core.middleware.random.random', return_value=0.9):
+            self.assertFalse(self.middleware.should_refresh(now + 60, 0.5))
+            self.assertTrue(self.middleware.should_refresh(now + 1, 0.5))
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth.models import User as AdminUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..fts import FTS_TABLE
+from ..models import Post, User
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.best = Post.objects.create(
+            author=cls.author, text='Котики, котики и ещё раз котики')
+        cls.other = Post.objects.create(
+            author=cls.author, text='Про собак и немного про котиков')
+        Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Котики номер {number}')
+            for number in range(12)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query, page=1):
+        return self.client.get(
+            reverse('post:search'), {'q': query, 'page': page})
+
+    def test_search_ranks_and_paginates(self):
+        """Выдача отсортирована по релевантности и разбита на страницы."""
+        response = self.search('КОТИКИ')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 13)
+        self.assertEqual(page_obj[0], self.best)
+        self.assertEqual(len(self.search('котики', page=2)
+                             .context['page_obj']), 3)
+        self.assertContains(response, '?q=%D0%9A%D0%9E%D0%A2%D0%98%D0%9A'
+                                      '%D0%98&amp;page=2')
+
+    def test_index_follows_updates_and_deletes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.other.pk)
+        post.text = 'Только собаки'
+        post.save()
+        self.assertEqual(
+            list(self.search('собаки').context['page_obj']), [post])
+        post.delete()
+        self.assertEqual(self.search('собаки').context['page_obj']
+                         .paginator.count, 0)
+
+    def test_fts_syntax_in_query_is_harmless(self):
+        """Операторы FTS5 во вводе не ломают запрос."""
+        for query in ('"', 'котики AND (', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query).status_code, 200)
+
+    def test_admin_search_uses_fts(self):
+        """Поиск в админке находит посты через FTS-индекс."""
+        admin = AdminUser.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        expected = {'собак котиков': 1, 'котики': 13, 'мышки': 0}
+        for query, count in expected.items():
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('admin:posts_post_changelist'), {'q': query})
+                self.assertEqual(response.context['cl'].result_count, count)
+
+    def test_rebuild_command_restores_index(self):
+        """rebuild_search_index восстанавливает триггеры и индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_ai')
+        lost = Post.objects.create(author=self.author, text='Потерянный')
+        self.assertEqual(self.search('потерянный').context['page_obj']
+                         .paginator.count, 0)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            list(self.search('потерянный').context['page_obj']), [lost])
+        found = Post.objects.create(author=self.author, text='Найденный')
+        self.assertEqual(
+            list(self.search('найденный').context['page_obj']), [found])
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.slowlog import normalize_sql
+
+from ..models import Post, User
+
+
+def logged_entries(logs):
+    return [
+        json.loads(record.getMessage()) for record in logs.records]
+
+
+@override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+class SlowLogMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0,
+                       SLOW_REQUEST_THRESHOLD_MS=None,
+                       SLOW_QUERY_LOG_PARAMS=True)
+    def test_slow_queries_are_logged_with_request_id(self):
+        url = reverse('post:post_detail', kwargs={'post_id': self.post.pk})
+        with self.assertLogs('yatube.slow', 'WARNING') as logs:
+            response = self.client.get(url)
+        entries = logged_entries(logs)
+        self.assertTrue(entries)
+        for entry in entries:
+            self.assertEqual(entry['type'], 'query')
+            self.assertEqual(entry['request_id'], response['X-Request-ID'])
+            self.assertEqual(entry['view'], 'post:post_detail')
+            self.assertEqual(entry['path'], url)
+            self.assertIn('SELECT', entry['sql'])
+            self.assertIn('duration_ms', entry)
+        self.assertIn(str(self.post.pk), entries[0]['params'])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0,
+                       SLOW_REQUEST_THRESHOLD_MS=None)
+    def test_query_params_are_not_logged_by_default(self):
+        url = reverse('post:post_detail', kwargs={'post_id': self.post.pk})
+        with self.assertLogs('yatube.slow', 'WARNING') as logs:
+            self.client.get(url)
+        for entry in logged_entries(logs):
+            self.assertIsNone(entry['params'])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=None,
+                       SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_summary(self):
+        with self.assertLogs('yatube.slow', 'WARNING') as logs:
+            self.client.get(
+                reverse('post:main'), HTTP_X_REQUEST_ID='proxy-id-1')
+        entry, = logged_entries(logs)
+        self.assertEqual(entry['type'], 'request')
+        self.assertEqual(entry['request_id'], 'proxy-id-1')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreater(entry['queries'], 0)
+
+    def test_fast_requests_are_not_logged(self):
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('yatube.slow', 'WARNING'):
+                self.client.get(reverse('about:author'))
+
+    def test_bad_incoming_request_id_is_replaced(self):
+        response = self.client.get(
+            reverse('about:author'), HTTP_X_REQUEST_ID='bad id\n')
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+
+class SlowQueriesCommandTests(SimpleTestCase):
+    def write_log(self, entries):
+        descriptor, path = tempfile.mkstemp(suffix='.log')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as stream:
+            stream.write('не JSON\n')
+            for entry in entries:
+                stream.write(
+                    '2024-01-01 00:00:00,000 ' + json.dumps(entry) + '\n')
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM t WHERE a = %s AND b IN (1, 2,  3)\n"
+                "AND c = 'it''s' LIMIT 21"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...) AND c = ? LIMIT ?',
+        )
+        self.assertEqual(
+            normalize_sql('INSERT INTO t VALUES (%s, %s), (%s, %s)'),
+            'INSERT INTO t VALUES (...)',
+        )
+
+    def test_top_shapes(self):
+        query = 'SELECT * FROM posts_post WHERE id = %s LIMIT 21'
+        other = 'SELECT COUNT(*) FROM posts_post'
+        path = self.write_log([
+            {'type': 'query', 'sql': query, 'duration_ms': 150,
+             'view': 'post:post_detail', 'request_id': 'a'},
+            {'type': 'query', 'sql': query.replace('21', '1'),
+             'duration_ms': 300, 'view': 'post:post_detail',
+             'request_id': 'b'},
+            {'type': 'query', 'sql': other, 'duration_ms': 200,
+             'view': 'post:main', 'request_id': 'c'},
+            {'type': 'request', 'duration_ms': 2000, 'request_id': 'b'},
+        ])
+        out = StringIO()
+        call_command('slow_queries', path, '--top', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn('count=2 total=450.0ms', output)
+        self.assertIn('slowest_request=b', output)
+        self.assertIn('post:post_detail ×2', output)
+        self.assertNotIn('COUNT(*)', output)
+        out = StringIO()
+        call_command('slow_queries', path, '--view', 'post:main',
+                     stdout=out)
+        self.assertIn('COUNT(*)', out.getvalue())
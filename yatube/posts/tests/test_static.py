@@ -0,0 +1,72 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import TestCase, override_settings
+
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_hashed_names_and_gzip_copies(self):
+        url = static('css/bootstrap.min.css')
+        self.assertRegex(
+            url, r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        path = os.path.join(STATIC_ROOT, url[len('/static/'):])
+        with open(path, 'rb') as original, \
+                gzip.open(f'{path}.gz') as compressed:
+            self.assertEqual(original.read(), compressed.read())
+        # PNG уже сжат, вторая копия не нужна.
+        self.assertFalse(os.path.exists(
+            os.path.join(STATIC_ROOT, 'img', 'logo.png.gz')))
+
+    def test_gzip_is_served_when_accepted(self):
+        url = static('css/bootstrap.min.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            response['Cache-Control'],
+            'public, max-age=31536000, immutable',
+        )
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'Bootstrap', body)
+
+    def test_plain_file_without_gzip(self):
+        response = self.client.get(static('css/bootstrap.min.css'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn(b'Bootstrap', b''.join(response.streaming_content))
+
+    def test_unhashed_name_is_not_immutable(self):
+        response = self.client.get('/static/css/bootstrap.min.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_not_modified(self):
+        url = static('img/logo.png')
+        response = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_and_outside_files(self):
+        for url in ('/static/css/missing.css', '/static/../manage.py'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT,
+                   ANONYMOUS_CACHE_URL_NAMES=[])
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'),
+        )
+
+    def test_original_is_shown_until_generated(self):
+        """Страница не режет картинку сама, а показывает оригинал."""
+        response = self.client.get(reverse('post:main'))
+        self.assertContains(response, self.post.image.url)
+        self.assertNotContains(response, '/media/cache/')
+        self.assertEqual(
+            thumbnails.get(self.post.image, 'feed').url,
+            self.post.image.url,
+        )
+
+    def test_command_generates_thumbnails(self):
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+        self.assertIn('Готово миниатюр: 1', out.getvalue())
+        feed = thumbnails.get(self.post.image, 'feed')
+        self.assertIn('/media/cache/', feed.url)
+        self.assertEqual((feed.width, feed.height), (960, 339))
+        # Страница из кеша фрагментов сбрасывается командой.
+        response = self.client.get(reverse('post:main'))
+        self.assertContains(response, feed.url)
+        response = self.client.get(
+            reverse('post:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(
+            response, thumbnails.get(self.post.image, 'detail').url)
+
+    def test_old_posts_are_skipped(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            updated_at='2021-01-01 00:00Z')
+        out = StringIO()
+        call_command('generate_thumbnails', '--since', '5', stdout=out)
+        self.assertIn('Готово миниатюр: 0', out.getvalue())
+        call_command('generate_thumbnails', '--all', stdout=out)
+        self.assertIn('Готово миниатюр: 1', out.getvalue())
+
+    def test_cached_thumbnails_need_no_queries(self):
+        call_command('generate_thumbnails', stdout=StringIO())
+        thumbnails.get(self.post.image, 'feed')
+        with self.assertNumQueries(0):
+            thumbnails.get(self.post.image, 'feed')
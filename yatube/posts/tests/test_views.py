@@ -1,5 +1,12 @@
+import re
+
 from django import forms
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import (
+    Client, SimpleTestCase, TestCase, override_settings,
+)
 from django.urls import reverse
 
 from ..forms import PostForm
@@ -31,6 +38,9 @@ class ViewsTests(TestCase):
         cls.authorized_client = Client()
         cls.authorized_client.force_login(cls.author)
 
+    def setUp(self):
+        cache.clear()
+
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
         templates_pages_names = {
@@ -61,6 +71,7 @@ class ViewsTests(TestCase):
         form_fields = {
             'text': forms.fields.CharField,
             'group': forms.fields.ChoiceField,
+            'image': forms.fields.ImageField,
         }
         for value, expected in form_fields.items():
             with self.subTest(value=value):
@@ -119,6 +130,7 @@ class ViewsTests(TestCase):
         form_fields = {
             'text': forms.fields.CharField,
             'group': forms.fields.ChoiceField,
+            'image': forms.fields.ImageField,
         }
         for value, expected in form_fields.items():
             with self.subTest(value=value):
@@ -181,6 +193,9 @@ class PaginatorViewsTest(TestCase):
         ]
         cls.post = Post.objects.bulk_create(objs)
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """Проверка: на первой странице должно быть 10 постов."""
         response = self.client.get(reverse('post:main'))
@@ -203,3 +218,147 @@ class PaginatorViewsTest(TestCase):
         response = self.client.get(reverse(
             'post:profile', kwargs={'username': self.author.username}))
         self.assertEqual(len(response.context['page_obj']), 10)
+
+
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        objs = [
+            Post(author=cls.author, text=f'Пост {number}')
+            for number in range(1, 26)
+        ]
+        Post.objects.bulk_create(objs)
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_links_lead_to_cursor_mode(self):
+        """Кнопка «Следующая» на ?page= ведёт на курсор, а ?page= работает."""
+        response = self.client.get(reverse('post:main') + '?page=1')
+        next_cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?cursor={next_cursor}')
+        response = self.client.get(
+            reverse('post:main') + f'?cursor={next_cursor}')
+        self.assertEqual(
+            list(response.context['page_obj']), self.posts[10:20])
+
+    def test_cursor_walks_feed_forward_and_back(self):
+        """Курсоры проходят ленту без пропусков и повторов в обе стороны."""
+        seen = []
+        cursor = ''
+        pages = []
+        while True:
+            response = self.client.get(
+                reverse('post:main') + f'?cursor={cursor}')
+            page_obj = response.context['page_obj']
+            pages.append(list(page_obj))
+            seen.extend(page_obj)
+            if not page_obj.has_next():
+                break
+            cursor = page_obj.next_cursor
+        self.assertEqual(seen, self.posts)
+        response = self.client.get(
+            reverse('post:main')
+            + f'?cursor={page_obj.previous_cursor}')
+        self.assertEqual(list(response.context['page_obj']), pages[-2])
+
+    def test_new_post_does_not_shift_cursor_page(self):
+        """Новый пост не сдвигает страницу, открытую по курсору."""
+        response = self.client.get(reverse('post:main'))
+        next_cursor = response.context['page_obj'].next_cursor
+        Post.objects.create(author=self.author, text='Свежий пост')
+        response = self.client.get(
+            reverse('post:main') + f'?cursor={next_cursor}')
+        self.assertEqual(
+            list(response.context['page_obj']), self.posts[10:20])
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Битый курсор отдаёт первую страницу, а не ошибку."""
+        response = self.client.get(reverse('post:main') + '?cursor=@@@')
+        self.assertEqual(
+            list(response.context['page_obj']), self.posts[:10])
+
+
+class PageWindowTest(SimpleTestCase):
+    def render(self, num_pages, number):
+        page = Paginator(range(num_pages * 10), 10).page(number)
+        return render_to_string('includes/paginator.html', {'page_obj': page})
+
+    def test_paginator_markup_does_not_grow_with_page_count(self):
+        """Пагинатор ссылается на одни и те же соседние страницы,
+        сколько бы страниц ни было."""
+        small_html = self.render(20, 10)
+        for num_pages in (20, 1000, 50_000):
+            with self.subTest(num_pages=num_pages):
+                number = num_pages // 2
+                html = self.render(num_pages, number)
+                self.assertEqual(
+                    html.count('page-item'), small_html.count('page-item'))
+                # Разница только в длине номеров страниц.
+                self.assertLess(len(html) - len(small_html), 100)
+                linked = {
+                    int(page) for page in re.findall(r'\?page=(\d+)', html)}
+                self.assertEqual(linked, {
+                    1, number - 2, number - 1,
+                    number + 1, number + 2, num_pages,
+                })
+
+    def test_paginator_shows_first_last_and_neighbours(self):
+        """Пагинатор показывает края и соседей текущей страницы."""
+        html = self.render(50_000, 25_000)
+        for number in (1, 24_998, 24_999, 25_001, 25_002, 50_000):
+            with self.subTest(number=number):
+                self.assertIn(f'?page={number}', html)
+        self.assertIn('<span class="page-link">25000</span>', html)
+        self.assertNotIn('?page=2"', html)
+        self.assertIn('&hellip;', html)
+
+
+@override_settings(ANONYMOUS_CACHE_URL_NAMES=[])
+class PostDetailConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.url = reverse('post:post_detail', kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_etag_returns_304_in_one_query(self):
+        """Совпавший ETag даёт 304 одним запросом и без отрисовки."""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIsNone(response.context)
+
+    def test_if_modified_since_is_ignored(self):
+        """Страница без Last-Modified: новый пост автора меняет счётчик,
+        хотя сам пост не правился."""
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        Post.objects.create(author=self.author, text='Ещё пост')
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<span> 2 </span>')
+
+    def test_etag_changes_on_edit_and_new_post(self):
+        """ETag меняется при правке поста и при новом посте автора."""
+        etag = self.client.get(self.url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        Post.objects.create(author=self.author, text='Ещё пост')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<span> 2 </span>')
@@ -0,0 +1,66 @@
+"""Миниатюры картинок постов, подготовленные заранее.
+
+Размеры перечислены в ``THUMBNAILS`` и используются и шаблонами, и
+командой ``generate_thumbnails``. Страницы получают миниатюры через
+``PregeneratedThumbnailBackend``: он только смотрит в key-value store
+sorl (в кеше) и никогда не режет картинку во время запроса.
+"""
+import logging
+
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+# Псевдоним -> (геометрия, опции sorl).
+THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('960', {'upscale': False}),
+}
+
+
+class PregeneratedThumbnailBackend(ThumbnailBackend):
+    """Отдаёт готовую миниатюру или, пока воркер её не сделал,
+    оригинал — но не создаёт миниатюру сам."""
+
+    def thumbnail_for(self, file_, geometry_string, options):
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return source, ImageFile(name, default.storage)
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not file_:
+            raise ValueError('falsey file_ argument in get_thumbnail()')
+        source, thumbnail = self.thumbnail_for(
+            file_, geometry_string, options)
+        cached = default.kvstore.get(thumbnail)
+        if cached:
+            return cached
+        logger.info('Миниатюра %s для %s ещё не готова',
+                    geometry_string, file_)
+        return source
+
+
+def generate(image):
+    """Создаёт все миниатюры картинки; уже готовые не пересоздаются."""
+    backend = ThumbnailBackend()
+    for geometry, options in THUMBNAILS.values():
+        backend.get_thumbnail(image, geometry, **options)
+
+
+def get(image, alias):
+    """Миниатюра для шаблона: готовая или оригинал, без генерации."""
+    geometry, options = THUMBNAILS[alias]
+    return PregeneratedThumbnailBackend().get_thumbnail(
+        image, geometry, **options)
@@ -0,0 +1,211 @@
+"""Персональная лента подписок.
+
+Новый пост сразу раскладывается по лентам подписчиков автора
+(fan-out on write): таблица ``TimelineEntry`` читается одним индексом
+(user, pub_date, post), сколько бы авторов ни было в подписках.
+
+У авторов с числом подписчиков больше ``POSTS_TIMELINE_FANOUT_LIMIT``
+раскладка стоила бы слишком дорого, поэтому их посты в таблицу не
+попадают, а подмешиваются при чтении (fan-out on read): список таких
+авторов короткий и лежит в кеше.
+"""
+from heapq import merge
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import CursorPaginator
+
+FANOUT_LIMIT = getattr(settings, 'POSTS_TIMELINE_FANOUT_LIMIT', 1000)
+# Сколько последних постов автора попадает в ленту при подписке.
+BACKFILL = getattr(settings, 'POSTS_TIMELINE_BACKFILL', 100)
+BATCH_SIZE = 500
+CELEBRITIES_KEY = 'posts:timeline:celebrities'
+FIELDS = ('pub_date', 'post_id')
+
+
+def celebrity_ids():
+    """Авторы, чьи посты подмешиваются при чтении, а не раскладываются."""
+    ids = cache.get(CELEBRITIES_KEY)
+    if ids is None:
+        ids = frozenset(AuthorStats.objects.filter(
+            followers_count__gt=FANOUT_LIMIT,
+        ).values_list('author_id', flat=True))
+        cache.set(CELEBRITIES_KEY, ids, None)
+    return ids
+
+
+def _insert(entries):
+    for start in range(0, len(entries), BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            entries[start:start + BATCH_SIZE], ignore_conflicts=True)
+
+
+def fan_out(posts):
+    """Раскладывает посты по лентам подписчиков их авторов.
+
+    ``posts`` — модели или словари с ``id``, ``author_id`` и
+    ``pub_date``. Посты авторов-«звёзд» пропускаются.
+    """
+    by_author = {}
+    for post in posts:
+        if not isinstance(post, dict):
+            post = {
+                'id': post.pk,
+                'author_id': post.author_id,
+                'pub_date': post.pub_date,
+            }
+        by_author.setdefault(post['author_id'], []).append(post)
+    celebrities = celebrity_ids()
+    for author_id, author_posts in by_author.items():
+        if author_id in celebrities:
+            continue
+        followers = Follow.objects.filter(
+            author_id=author_id).values_list('user_id', flat=True)
+        batch = []
+        for user_id in followers.iterator():
+            batch.extend(
+                TimelineEntry(
+                    user_id=user_id,
+                    post_id=post['id'],
+                    author_id=author_id,
+                    pub_date=post['pub_date'],
+                )
+                for post in author_posts
+            )
+            if len(batch) >= BATCH_SIZE:
+                _insert(batch)
+                batch = []
+        _insert(batch)
+
+
+def backfill(user_ids, author_id):
+    """Кладёт в ленты ``user_ids`` последние посты автора."""
+    if author_id in celebrity_ids():
+        return
+    recent = list(Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id').values('id', 'pub_date')[:BACKFILL])
+    _insert([
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post['id'],
+            author_id=author_id,
+            pub_date=post['pub_date'],
+        )
+        for user_id in user_ids
+        for post in recent
+    ])
+
+
+def _change_followers(author_id, delta):
+    """Правит счётчик подписчиков и возвращает новое значение."""
+    with transaction.atomic():
+        updated = AuthorStats.objects.filter(author_id=author_id).update(
+            followers_count=F('followers_count') + delta)
+        if not updated:
+            if delta < 0:
+                # Строки нет: автор удаляется вместе с подписками.
+                return None
+            AuthorStats.objects.get_or_create(
+                author_id=author_id,
+                defaults={
+                    'posts_count': Post.objects.filter(
+                        author_id=author_id).count(),
+                    'followers_count': Follow.objects.filter(
+                        author_id=author_id).count(),
+                },
+            )
+        return AuthorStats.objects.filter(author_id=author_id).values_list(
+            'followers_count', flat=True).first()
+
+
+def followed(user_id, author_id):
+    count = _change_followers(author_id, 1)
+    if count == FANOUT_LIMIT + 1:
+        # Автор стал «звездой»: дальше его посты читаются напрямую.
+        cache.delete(CELEBRITIES_KEY)
+    backfill([user_id], author_id)
+
+
+def unfollowed(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+    count = _change_followers(author_id, -1)
+    if count == FANOUT_LIMIT:
+        # Снова обычный автор: его посты, опубликованные в статусе
+        # «звезды», раскладываем подписчикам задним числом.
+        cache.delete(CELEBRITIES_KEY)
+        followers = list(Follow.objects.filter(
+            author_id=author_id).values_list('user_id', flat=True))
+        backfill(followers, author_id)
+
+
+class MergedQuerySet:
+    """Несколько querysets со строками одного вида как один.
+
+    Поддерживает ровно то, что нужно CursorPaginator: ``filter``,
+    ``order_by`` и срез ``[:limit]``. Каждый queryset читается с тем
+    же LIMIT, результаты сливаются по ключу сортировки.
+    """
+
+    def __init__(self, querysets, ordering=()):
+        self.querysets = querysets
+        self.ordering = ordering
+
+    def filter(self, *args, **kwargs):
+        return MergedQuerySet(
+            [queryset.filter(*args, **kwargs) for queryset in self.querysets],
+            self.ordering,
+        )
+
+    def order_by(self, *fields):
+        return MergedQuerySet(
+            [queryset.order_by(*fields) for queryset in self.querysets],
+            fields,
+        )
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.start:
+            raise TypeError('Поддерживается только срез [:limit].')
+        fields = [field.lstrip('-') for field in self.ordering]
+        descending = bool(self.ordering) and self.ordering[0][0] == '-'
+        rows = merge(
+            *(list(queryset[:item.stop]) for queryset in self.querysets),
+            key=lambda row: tuple(row[field] for field in fields),
+            reverse=descending,
+        )
+        return list(rows)[:item.stop]
+
+
+def sources(user):
+    """Ключи (pub_date, post_id) ленты: таблица плюс посты «звёзд»."""
+    celebrities = celebrity_ids()
+    entries = TimelineEntry.objects.filter(user=user)
+    if not celebrities:
+        return MergedQuerySet([entries.values(*FIELDS)])
+    # Строки, разложенные до того, как автор стал «звездой», не нужны:
+    # его посты целиком придут вторым запросом.
+    querysets = [entries.exclude(author_id__in=celebrities).values(*FIELDS)]
+    followed_celebrities = list(Follow.objects.filter(
+        user=user, author_id__in=celebrities,
+    ).values_list('author_id', flat=True))
+    if followed_celebrities:
+        querysets.append(Post.objects.filter(
+            author_id__in=followed_celebrities,
+        ).values('pub_date', post_id=F('id')))
+    return MergedQuerySet(querysets)
+
+
+def _posts(keys):
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [key['post_id'] for key in keys])
+    return [posts[key['post_id']] for key in keys if key['post_id'] in posts]
+
+
+def page(user, cursor, per_page):
+    """Страница персональной ленты с keyset-пагинацией по ?cursor=."""
+    paginator = CursorPaginator(
+        sources(user), per_page, fields=FIELDS, prepare=_posts)
+    return paginator.page(cursor)
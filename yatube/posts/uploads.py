@@ -0,0 +1,45 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+def max_upload_size():
+    return getattr(settings, 'POSTS_IMAGE_MAX_SIZE', 5 * 1024 * 1024)
+
+
+class OversizedUpload(UploadedFile):
+    """Заглушка вместо файла, превысившего лимит: содержимого нет,
+    ``size`` — сколько байт успело прийти."""
+
+    def __init__(self, name, content_type, size, charset):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """Стоит первым в ``FILE_UPLOAD_HANDLERS`` и считает байты файла.
+
+    Пока файл укладывается в ``POSTS_IMAGE_MAX_SIZE``, куски уходят
+    следующему обработчику (TemporaryFileUploadHandler пишет их на
+    диск). После превышения куски отбрасываются, а форма получает
+    OversizedUpload и показывает ошибку размера.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.limit = max_upload_size()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received > self.limit:
+            return OversizedUpload(
+                self.file_name, self.content_type, self.received,
+                self.charset)
+        return None
@@ -1,14 +1,41 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'post'
 
 urlpatterns = [
     path('', views.index, name='main'),
+    path('rss/', feeds.PostsFeed(), name='feed_rss'),
+    path('atom/', feeds.PostsAtomFeed(), name='feed_atom'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
+    path('group/<slug:slug>/export/', views.group_export,
+         name='group_export'),
+    path('group/<slug:slug>/rss/', feeds.GroupPostsFeed(),
+         name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.GroupPostsAtomFeed(),
+         name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/export/', views.profile_export,
+         name='profile_export'),
+    path('profile/<str:username>/rss/', feeds.AuthorPostsFeed(),
+         name='profile_rss'),
+    path('profile/<str:username>/atom/', feeds.AuthorPostsAtomFeed(),
+         name='profile_atom'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='create'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
+    path('search/', views.search, name='search'),
+    path('api/posts/', api.post_list, name='api_posts'),
+    path('api/posts/<int:post_id>/', api.post_detail,
+         name='api_post_detail'),
+    path('api/group/<slug:slug>/posts/', api.group_post_list,
+         name='api_group_posts'),
+    path('api/profile/<str:username>/posts/', api.profile_post_list,
+         name='api_profile_posts'),
 ]
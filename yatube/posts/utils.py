@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+
+from .models import Post
+
+
+@contextmanager
+def preserve_pub_date():
+    """Отключает auto_now_add у Post.pub_date на время блока.
+
+    Нужно для массовой загрузки постов с заранее известными датами:
+    иначе bulk_create проставит всем текущее время.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
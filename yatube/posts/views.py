@@ -1,9 +1,23 @@
+import hashlib
+from functools import partial
+
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+from django.views.decorators.http import require_POST
 
+from . import export, thumbnails, timeline
+from .counters import CountedPaginator, author_count, feed_count, group_count
+from .fragments import fragment_key
 from .forms import PostForm
-from .models import Post, User, Group
+from .models import Follow, Post, User, Group
+from .paginators import (
+    CursorLinkedPage, CursorPaginator, decode_cursor, encode_cursor,
+)
+from .search import search_posts
 
 AMOUNT_POST = 10
 
@@ -11,29 +25,51 @@ AMOUNT_POST = 10
 def index(request):
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
-    post_list = Post.objects.all().order_by('-pub_date')
-    paginator = Paginator(post_list, AMOUNT_POST)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.select_related(
+        'author', 'group').order_by('-pub_date', '-id')
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        page_obj = CursorPaginator(post_list, AMOUNT_POST).page(cursor)
+        # Ключ — разобранная позиция, а не сырая строка: любой битый
+        # курсор отдаёт первую страницу и делит с ней одну запись кеша.
+        position = decode_cursor(cursor)
+        page_key = 'cursor=' + (position and encode_cursor(*position) or '')
+    else:
+        # Старые ссылки ?page=N продолжают работать через OFFSET.
+        paginator = CountedPaginator(
+            post_list, AMOUNT_POST, feed_count, page_class=CursorLinkedPage)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+        page_key = f'page={page_obj.number}'
     context = {
         'page_obj': page_obj,
         'title': title,
+        'fragment_key': fragment_key('index', page_key, 'all'),
     }
     return render(request, template, context)
 
 
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, AMOUNT_POST)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    post_list = author.posts.select_related(
+        'author', 'group').order_by('-pub_date', '-id')
+    counter_posts = author_count(author)
+    paginator = CountedPaginator(
+        post_list, AMOUNT_POST, lambda: counter_posts)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    counter_posts = author.posts.count()
+    following = (
+        request.user.is_authenticated and request.user != author
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
     context = {
         'author': author,
         'page_obj': page_obj,
         'counter_posts': counter_posts,
-
+        'following': following,
+        'fragment_key': fragment_key(
+            'profile', page_obj.number, 'author', author.pk),
     }
     template = 'posts/profile.html'
     return render(request, template, context)
@@ -43,38 +79,106 @@ def group_posts(request, slug):
     template = 'posts/group_list.html'
     title = 'Записи сообщества'
     group = get_object_or_404(Group, slug=slug)
-    get_posts = Post.objects.filter(group=group)
-    posts = get_posts.order_by('-pub_date')[:AMOUNT_POST]
-    paginator = Paginator(posts, AMOUNT_POST)
+    post_list = Post.objects.filter(group=group).select_related(
+        'author', 'group').order_by('-pub_date', '-id')
+    paginator = CountedPaginator(
+        post_list, AMOUNT_POST, partial(group_count, group.pk))
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'title': title,
         'group': group,
-        'posts': posts,
+        'fragment_key': fragment_key(
+            'group', page_obj.number, 'group', group.pk),
     }
     return render(request, template, context)
 
 
-# Исправлено в шаблоне post_detail
-def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    username_obj = User.objects.get(username=post.author)
-    posts_counter = username_obj.posts.count()
-    template = 'posts/post_detail.html'
-    title = 'Подробная информация'
+def _export_response(request, queryset, filename):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        raise Http404(f'Неизвестный формат выгрузки: {fmt}')
+    render_rows, content_type = export.FORMATS[fmt]
+    response = StreamingHttpResponse(
+        render_rows(export.export_rows(queryset)),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{fmt}"')
+    return response
+
+
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return _export_response(
+        request, author.posts.all(), f'posts-{author.username}')
+
+
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _export_response(
+        request, Post.objects.filter(group=group), f'posts-{group.slug}')
+
+
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search_posts(query), AMOUNT_POST)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
     context = {
-        'title': title,
-        'post': post,
-        'posts_counter': posts_counter
+        'page_obj': page_obj,
+        'query': query,
+        'pagination_params': urlencode({'q': query}) + '&',
     }
     return render(request, template, context)
 
 
+def _post_detail_etag(post, posts_counter, user):
+    """ETag страницы поста: всё, от чего зависит её разметка."""
+    group = post.group
+    parts = [
+        post.pk,
+        post.updated_at.isoformat(),
+        post.author.username,
+        posts_counter,
+        group and group.slug,
+        group and group.title,
+        # Пока воркер не сделал миниатюру, на странице стоит оригинал.
+        post.image and thumbnails.get(post.image, 'detail').url,
+        # Ссылка «Редактировать» и шапка зависят от пользователя.
+        user.pk,
+    ]
+    digest = hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+# Исправлено в шаблоне post_detail
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
+    posts_counter = author_count(post.author)
+    etag = _post_detail_etag(post, posts_counter, request.user)
+    # Только ETag: дата правки поста не учитывает ни счётчик, ни группу,
+    # ни пользователя, и If-Modified-Since отдавал бы устаревшую страницу.
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        template = 'posts/post_detail.html'
+        title = 'Подробная информация'
+        context = {
+            'title': title,
+            'post': post,
+            'posts_counter': posts_counter
+        }
+        response = render(request, template, context)
+    response['ETag'] = etag
+    return response
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -86,7 +190,8 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    form = PostForm(request.POST, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post)
     if post.author != request.user:
         return redirect('post:post_detail', post_id=post_id)
     if form.is_valid():
@@ -96,6 +201,36 @@ def post_edit(request, post_id):
     context = {'form': form, 'is_edit': is_edit}
     return render(request, 'posts/create_post.html', context)
 
+
+@login_required
+def follow_index(request):
+    page_obj = timeline.page(
+        request.user, request.GET.get('cursor'), AMOUNT_POST)
+    context = {
+        'page_obj': page_obj,
+        'title': 'Посты авторов, на которых вы подписаны',
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('post:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    # delete() у queryset шлёт post_delete, лента чистится сигналом.
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('post:profile', username)
+
+
 # Второй вариант реализации подробнее и мне понятнее,чем первый.
 # @login_required
 # def post_edit(request, post_id):
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_key(user_id):
+    return f'users:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша.
+
+    Запись сбрасывается сигналами при любом сохранении пользователя
+    (смена пароля, last_login, is_active), его удалении и выходе.
+    Нужен общий для воркеров кеш (проверка users.E001).
+    """
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, getattr(
+                settings, 'USERS_CACHE_TIMEOUT', 60 * 60))
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кеши, которые у каждого процесса свои.
+PER_PROCESS_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кешированные пользователь и сессия требуют общего кеша.
+
+    Выход, смена пароля или ``is_active=False`` сбрасывают запись только
+    в кеше процесса, обработавшего запрос: с LocMemCache остальные
+    воркеры пускали бы по старой сессии до истечения срока.
+    """
+    users = []
+    if 'users.backends.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS:
+        users.append(('AUTHENTICATION_BACKENDS', 'default'))
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES:
+        users.append(('SESSION_ENGINE', settings.SESSION_CACHE_ALIAS))
+    errors = []
+    for setting, alias in users:
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PER_PROCESS_CACHES:
+            errors.append(Error(
+                f'{setting} кеширует пользователя или сессию в кеше '
+                f'«{alias}», который у каждого процесса свой.',
+                hint=(
+                    'Укажите общий кеш (core.cache.backends.sqlite.'
+                    'SQLiteCache, Memcached, Redis) или верните '
+                    'ModelBackend и сессии в базе.'
+                ),
+                id='users.E001',
+            ))
+    return errors
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_changed_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def forget_user_with_new_permissions(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        forget_user(instance.pk)
+    elif pk_set:
+        # Изменение со стороны группы или права: pk_set — пользователи.
+        for user_id in pk_set:
+            forget_user(user_id)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
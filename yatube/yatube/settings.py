@@ -15,6 +15,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
@@ -22,11 +23,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowLogMiddleware',
+    'core.middleware.AnonymousCacheMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -53,13 +60,117 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# core.db.backends.sqlite3 — sqlite3 с WAL, mmap и прочими PRAGMA
+# (см. PRAGMAS там же); соединение живёт между запросами.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 600,
+    },
+    # Копия основной базы: manage.py sync_replica.
+    'replica': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db-replica.sqlite3'),
+        'CONN_MAX_AGE': 600,
+    },
+}
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+# Алиас реплики для чтения в GET/HEAD, None — всё читается из default.
+# После записи пользователь REPLICA_PIN_SECONDS читает из default.
+REPLICA_DATABASE = None
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+# Общий для всех воркеров кеш в файле SQLite: счётчики, версии
+# фрагментов и блокировки через add() согласованы между процессами.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.backends.sqlite.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'MAX_SIZE': 256 * 1024 * 1024,
+        },
     }
 }
 
+# Счётчики постов для пагинации живут в кеше и обновляются сигналами.
+# Пересчёт может разминуться с сигналом, поэтому срок — минута.
+POSTS_COUNT_CACHE_TIMEOUT = 60
+# Оценивать размер главной ленты по диапазону id вместо COUNT(*).
+POSTS_APPROXIMATE_FEED_COUNT = False
+# Срок жизни разметки страниц ленты; сигналы сбрасывают её раньше.
+POSTS_FRAGMENT_CACHE_TIMEOUT = 60 * 5
+# XML лент RSS/Atom; новый пост в ленте сбрасывает его раньше.
+POSTS_FEED_CACHE_TIMEOUT = 60 * 60
+
+# Готовые ответы для анонимных посетителей. Версия ленты входит в ключ,
+# поэтому новый пост сразу сбрасывает все закешированные страницы.
+ANONYMOUS_CACHE_URL_NAMES = [
+    'post:main',
+    'post:group',
+    'post:profile',
+    'post:post_detail',
+    'about:author',
+    'about:tech',
+]
+ANONYMOUS_CACHE_TIMEOUT = 60
+ANONYMOUS_CACHE_STALE_TIMEOUT = 30
+# GET-параметры, от которых зависят кешируемые страницы.
+ANONYMOUS_CACHE_QUERY_PARAMS = ['page', 'cursor']
+ANONYMOUS_CACHE_VERSION = 'posts.fragments.feed_version'
+
+# Метрики по маршрутам для Prometheus на /metrics.
+METRICS_ENABLED = True
+# Токен для сбора метрик (Authorization: Bearer ...); без него /metrics
+# доступен только сотрудникам.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Журнал медленных запросов (JSON-строки), сводка — manage.py slow_queries.
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_REQUEST_THRESHOLD_MS = 1000
+# Параметры запросов пишутся как есть, вместе с хешами паролей и данными
+# сессий: включайте только для отладки.
+SLOW_QUERY_LOG_PARAMS = False
+SLOW_LOG_FILE = os.path.join(BASE_DIR, 'slow.log')
+
+# Профилирование запросов сотрудников по ?_profile=1, список — /_profiles/.
+PROFILER_ENABLED = False
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILER_KEEP = 50
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'slow': {'format': '%(asctime)s %(message)s'},
+    },
+    'handlers': {
+        'slow_file': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_LOG_FILE,
+            'formatter': 'slow',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow': {
+            'handlers': ['slow_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Сессия и пользователь читаются из кеша: залогиненный запрос не ходит
+# в базу до view. Сессии пишутся и в кеш, и в таблицу (write-through).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+USERS_CACHE_TIMEOUT = 60 * 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -87,6 +198,28 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# collectstatic добавляет хеш в имена и кладёт рядом .gz; собранное
+# отдаёт StaticFilesMiddleware с вечным кешем для имён с хешем.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = True
+STATIC_MAX_AGE = 60 * 60
+STATIC_GZIP_MIN_SIZE = 256
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загрузки всегда пишутся на диск кусками, лимит проверяется на лету.
+POSTS_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Миниатюры готовит generate_thumbnails, страницы их только читают;
+# key-value store sorl живёт в кеше поверх таблицы.
+THUMBNAIL_BACKEND = 'posts.thumbnails.PregeneratedThumbnailBackend'
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = '/'
 
@@ -0,0 +1,14 @@
+"""Настройки для ``manage.py test`` и pytest."""
+from .settings import *  # noqa: F401,F403
+
+# Иначе тесты очищали бы кеш, сессии и пользователей dev-сервера, а
+# два прогона одновременно затирали бы данные друг друга.
+# SQLiteCache проверяет только test_cache_backend.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube-tests',
+    }
+}
+# Тесты идут в одном процессе, общий кеш им не нужен.
+SILENCED_SYSTEM_CHECKS = ['users.E001']
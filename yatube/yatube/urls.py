@@ -1,10 +1,24 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core import views as core_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', core_views.metrics, name='metrics'),
+    path('_profiles/', core_views.profiler_index, name='profiler_index'),
+    path('_profiles/<str:name>/', core_views.profiler_detail,
+         name='profiler_detail'),
+    path('_profiles/<str:name>/download/', core_views.profiler_download,
+         name='profiler_download'),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace='post')),
     path('about/', include('about.urls', namespace='about')),
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)